@@ -7,6 +7,7 @@ from django.dispatch import receiver
 from django.utils import timezone
 from faker import Faker
 
+from portfolio.services import invalidate_portfolio_summaries
 from transactions.models import Asset, Transaction, TransactionType
 from wallets.models import User, UserSettings, Wallet
 
@@ -134,7 +135,9 @@ def create_transactions(wallet, assets, count):
     """Create mock transactions for a wallet"""
     # Start from 30 days ago
     start_date = timezone.now() - timedelta(days=30)
+    generated_at = timezone.now().isoformat()
     
+    transactions = []
     for i in range(count):
         # Random timestamp within the last 30 days
         timestamp = start_date + timedelta(
@@ -165,8 +168,7 @@ def create_transactions(wallet, assets, count):
         else:
             gas_fee = Decimal(str(random.uniform(0.00001, 0.001)))  # SOL
         
-        # Create transaction
-        Transaction.objects.create(
+        transactions.append(Transaction(
             wallet=wallet,
             tx_hash=fake.hexify(text="0x^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^"),
             block_number=random.randint(1000000, 9999999),
@@ -177,5 +179,10 @@ def create_transactions(wallet, assets, count):
             asset_address=fake.hexify(text="0x^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^"),
             gas_fee=gas_fee,
             usd_value=usd_value,
-            metadata={"mock": True, "generated_at": timezone.now().isoformat()},
-        )
\ No newline at end of file
+            metadata={"mock": True, "generated_at": generated_at},
+        ))
+    
+    # One INSERT and one summary invalidation for the whole wallet; bulk_create
+    # sends no post_save, so the invalidation is explicit
+    Transaction.objects.bulk_create(transactions)
+    invalidate_portfolio_summaries([wallet.user_id])
\ No newline at end of file
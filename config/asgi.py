@@ -0,0 +1,49 @@
+"""
+ASGI config for portfolio dashboard project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serving through ASGI lets the SSE endpoints stream from async generators
+instead of holding a worker thread per connected client.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+from django.urls import Resolver404, resolve
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+django_application = get_asgi_application()
+
+# Imported after Django is set up so app models are loaded
+from core.template_cache import warm_template_cache  # noqa: E402
+from core.views import chart_stream_asgi  # noqa: E402
+
+warm_template_cache()
+
+CHART_STREAM_VIEW = "htmx:chart_stream"
+
+
+def is_chart_stream_path(path, root_path=""):
+    """True when ``path`` resolves to the chart_stream route in core/urls.py"""
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    try:
+        return resolve(path).view_name == CHART_STREAM_VIEW
+    except Resolver404:
+        return False
+
+
+async def application(scope, receive, send):
+    """Serve the chart SSE stream directly; everything else goes to Django"""
+    if (
+        scope["type"] == "http"
+        and scope["method"] == "GET"
+        and is_chart_stream_path(scope["path"], scope.get("root_path", ""))
+    ):
+        await chart_stream_asgi(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -10,9 +10,6 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
-        'OPTIONS': {
-            'init_command': 'PRAGMA foreign_keys=ON;',
-        },
     }
 }
 
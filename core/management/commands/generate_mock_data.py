@@ -6,11 +6,14 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from faker import Faker
 
+from portfolio.services import invalidate_portfolio_summaries
 from transactions.models import Asset, Transaction, TransactionType
 from wallets.models import User, UserSettings, Wallet
 
 fake = Faker()
 
+BULK_BATCH_SIZE = 500
+
 
 class Command(BaseCommand):
     help = "Generate mock data for testing and demo purposes"
@@ -240,7 +243,9 @@ class Command(BaseCommand):
         """Create mock transactions for a wallet"""
         # Start from 30 days ago
         start_date = timezone.now() - timedelta(days=30)
+        generated_at = timezone.now().isoformat()
 
+        transactions = []
         for i in range(count):
             # Random timestamp within the last 30 days
             timestamp = start_date + timedelta(
@@ -270,21 +275,26 @@ class Command(BaseCommand):
             else:
                 gas_fee = Decimal(str(random.uniform(0.00001, 0.001)))  # SOL
 
-            # Create transaction
-            Transaction.objects.create(
-                wallet=wallet,
-                tx_hash=fake.hexify(
-                    text="0x^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^"
-                ),
-                block_number=random.randint(1000000, 9999999),
-                timestamp=timestamp,
-                transaction_type=tx_type,
-                amount=amount,
-                asset_symbol=asset.symbol,
-                asset_address=fake.hexify(
-                    text="0x^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^"
-                ),
-                gas_fee=gas_fee,
-                usd_value=usd_value,
-                metadata={"mock": True, "generated_at": timezone.now().isoformat()},
+            transactions.append(
+                Transaction(
+                    wallet=wallet,
+                    tx_hash=fake.hexify(
+                        text="0x^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^"
+                    ),
+                    block_number=random.randint(1000000, 9999999),
+                    timestamp=timestamp,
+                    transaction_type=tx_type,
+                    amount=amount,
+                    asset_symbol=asset.symbol,
+                    asset_address=fake.hexify(
+                        text="0x^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^"
+                    ),
+                    gas_fee=gas_fee,
+                    usd_value=usd_value,
+                    metadata={"mock": True, "generated_at": generated_at},
+                )
             )
+
+        Transaction.objects.bulk_create(transactions, batch_size=BULK_BATCH_SIZE)
+        # bulk_create sends no post_save, so drop the owner's summary here
+        invalidate_portfolio_summaries([wallet.user_id])
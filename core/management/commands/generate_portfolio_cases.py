@@ -7,11 +7,14 @@ from django.utils import timezone
 from faker import Faker
 
 from portfolio.models import InvestigationCase, CaseWallet, InvestigationStatus, WalletCategory
+from portfolio.services import invalidate_portfolio_summaries
 from transactions.models import Asset, Transaction, TransactionType
 from wallets.models import User, UserSettings, Wallet
 
 fake = Faker()
 
+BULK_BATCH_SIZE = 500
+
 
 class Command(BaseCommand):
     help = "Generate impressive portfolio case data for demo"
@@ -80,6 +83,7 @@ class Command(BaseCommand):
             status=InvestigationStatus.ACTIVE,
             priority=data["priority"],
             notes=f"Tracking {data['pattern']} patterns across {len(data['chains'])} chains",
+            pattern_slug=data["pattern"],
             created_at=timezone.now() - timedelta(days=random.randint(7, 30))
         )
         self.stdout.write(f"  Created: {case.name}")
@@ -132,6 +136,7 @@ class Command(BaseCommand):
         
         num_transactions = tx_counts.get(data["pattern"], 300)
         
+        transactions = []
         for i in range(num_transactions):
             wallet = random.choice(case_wallets).wallet
             asset = random.choice(assets)
@@ -154,7 +159,7 @@ class Command(BaseCommand):
                 minutes=random.randint(0, 59)
             )
             
-            Transaction.objects.create(
+            transactions.append(Transaction(
                 wallet=wallet,
                 tx_hash="0x" + fake.hexify(text="^" * 64),
                 block_number=random.randint(18000000, 19000000),
@@ -169,7 +174,11 @@ class Command(BaseCommand):
                     "chain": wallet.chain,
                     "protocol": random.choice(["uniswap", "sushiswap", "1inch", "paraswap"])
                 }
-            )
+            ))
+            
+        Transaction.objects.bulk_create(transactions, batch_size=BULK_BATCH_SIZE)
+        # bulk_create sends no post_save, so drop the owners' summaries here
+        invalidate_portfolio_summaries(tx.wallet.user_id for tx in transactions)
             
     def _get_assets(self):
         """Get common trading assets with prices"""
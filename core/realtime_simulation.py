@@ -3,6 +3,7 @@ Real-time blockchain data simulation for demonstration purposes.
 Generates realistic-looking fraudulent money movement patterns.
 """
 
+import functools
 import random
 import time
 import math
@@ -15,6 +16,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Data points kept per chain (enough for the longest chart timeframe)
+HISTORY_LENGTH = 200
+
 
 class BlockchainSimulator:
     """
@@ -60,7 +64,8 @@ class BlockchainSimulator:
         self.running = False
         self.thread = None
         
-        # Data history for charts
+        # Data history for charts, stored as flat float series per chain so
+        # get_current_data can slice them straight into the JSON payload
         self.balance_history = {chain: [] for chain in self.chains}
         self.volume_history = {chain: [] for chain in self.chains}
         self.transaction_events = []
@@ -107,22 +112,16 @@ class BlockchainSimulator:
             balance = self._calculate_chain_balance(chain_id, chain_config)
             volume = self._calculate_chain_volume(chain_id, chain_config)
             
-            # Store data point
-            data_point = {
-                'timestamp': self.current_time.isoformat(),
-                'balance': balance,
-                'volume': volume,
-                'chain': chain_id
-            }
-            
-            self.balance_history[chain_id].append(data_point)
-            self.volume_history[chain_id].append(data_point)
+            balance_history = self.balance_history[chain_id]
+            volume_history = self.volume_history[chain_id]
+            balance_history.append(balance)
+            volume_history.append(volume)
             
-            # Keep only last 200 data points per chain (for longer timeframes)
-            if len(self.balance_history[chain_id]) > 200:
-                self.balance_history[chain_id].pop(0)
-            if len(self.volume_history[chain_id]) > 200:
-                self.volume_history[chain_id].pop(0)
+            # Keep only the last HISTORY_LENGTH data points per chain
+            if len(balance_history) > HISTORY_LENGTH:
+                del balance_history[0]
+            if len(volume_history) > HISTORY_LENGTH:
+                del volume_history[0]
                 
         # Generate fraud events occasionally
         if random.random() < 0.1:  # 10% chance per tick
@@ -265,19 +264,19 @@ class BlockchainSimulator:
             
         # Get recent data for each chain
         multi_chain_data = {}
-        for chain_id in self.chains:
-            balance_data = self.balance_history[chain_id][-num_points:] if self.balance_history[chain_id] else []
-            volume_data = self.volume_history[chain_id][-num_points:] if self.volume_history[chain_id] else []
+        for chain_id, config in self.chains.items():
+            balances = self.balance_history[chain_id][-num_points:]
+            volumes = self.volume_history[chain_id][-num_points:]
             
-            # Pad with zeros if not enough data
-            while len(balance_data) < num_points:
-                balance_data.insert(0, {'balance': self.chains[chain_id]['base_balance'], 'volume': 0})
-            while len(volume_data) < num_points:
-                volume_data.insert(0, {'balance': self.chains[chain_id]['base_balance'], 'volume': 0})
+            # Pad with the base balance / zero volume if not enough data
+            if len(balances) < num_points:
+                balances = [config['base_balance']] * (num_points - len(balances)) + balances
+            if len(volumes) < num_points:
+                volumes = [0] * (num_points - len(volumes)) + volumes
                 
             multi_chain_data[chain_id] = {
-                'balances': [d['balance'] for d in balance_data[-num_points:]],
-                'volume': [d['volume'] for d in volume_data[-num_points:]]
+                'balances': balances,
+                'volume': volumes
             }
             
         # Calculate summary stats
@@ -310,20 +309,16 @@ class BlockchainSimulator:
         }
 
 
-# Global simulator instance
-_simulator = None
-
+# Global simulator instance, created and started on first use
+@functools.cache
 def get_simulator() -> BlockchainSimulator:
     """Get the global simulator instance."""
-    global _simulator
-    if _simulator is None:
-        _simulator = BlockchainSimulator()
-        _simulator.start_simulation()
-    return _simulator
+    simulator = BlockchainSimulator()
+    simulator.start_simulation()
+    return simulator
 
 def stop_global_simulator():
     """Stop the global simulator."""
-    global _simulator
-    if _simulator:
-        _simulator.stop_simulation()
-        _simulator = None
\ No newline at end of file
+    if get_simulator.cache_info().currsize:
+        get_simulator().stop_simulation()
+        get_simulator.cache_clear()
@@ -0,0 +1,28 @@
+"""
+Warm Django's cached template loader when a worker process starts.
+"""
+
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+
+def warm_template_cache():
+    """Compile every project template once so first requests skip parsing.
+
+    The cached loader keeps compiled templates for the life of the process,
+    so after this no request pays for template lookup or compilation.
+    """
+    for template_dir in settings.TEMPLATES[0]["DIRS"]:
+        root = Path(template_dir)
+        for path in root.rglob("*.html"):
+            name = path.relative_to(root).as_posix()
+            try:
+                get_template(name)
+            except TemplateSyntaxError as e:
+                logger.warning(f"Skipping template {name}: {e}")
@@ -2,12 +2,18 @@
 Core app tests - HTMX views, authentication, and navigation.
 """
 
-from django.test import TestCase, Client
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.http import HttpResponse
+from django.utils import timezone
+from decimal import Decimal
 from unittest.mock import patch, MagicMock
 
+from portfolio.models import CaseWallet, InvestigationCase, WalletCategory
+from transactions.models import Transaction, TransactionType
+from wallets.models import Chain, Wallet
+
 User = get_user_model()
 
 
@@ -197,4 +203,99 @@ class AuthenticationTestCase(TestCase):
         
         for url in protected_urls:
             response = self.client.get(url)
-            self.assertEqual(response.status_code, 302, f"URL {url} should require auth")
\ No newline at end of file
+            self.assertEqual(response.status_code, 302, f"URL {url} should require auth")
+
+class CaseDashboardCacheTestCase(TestCase):
+    """Test the case dashboard's cached fragment is keyed on its data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up a case with one of three wallets and two transactions."""
+        cls.user = User.objects.create_user(email="test@example.com", username="testuser")
+        cls.case = InvestigationCase.objects.create(name="Case", investigator=cls.user)
+        cls.wallets = Wallet.objects.bulk_create([
+            Wallet(user=cls.user, label=f"Wallet {i}", chain=Chain.ETHEREUM, address=f"0x{i:040x}")
+            for i in range(3)
+        ])
+        cls.case_wallet = CaseWallet.objects.create(case=cls.case, wallet=cls.wallets[0])
+        now = timezone.now()
+        cls.transactions = Transaction.objects.bulk_create([
+            Transaction(
+                wallet=cls.wallets[0],
+                tx_hash=f"0x{i:064x}",
+                block_number=12345 + i,
+                transaction_type=TransactionType.BUY,
+                amount=Decimal("1.0"),
+                asset_symbol="ETH",
+                gas_fee=Decimal("0.001"),
+                timestamp=now - timezone.timedelta(hours=i),
+            )
+            for i in range(2)
+        ])
+
+    def setUp(self):
+        """Log in the case investigator."""
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def fingerprint(self):
+        """Render the case dashboard and return its cache fingerprint."""
+        url = reverse("htmx:case_detail", args=[self.case.id])
+        return self.client.get(url).context["cache_fingerprint"]
+
+    def test_fingerprint_tracks_case_wallet_edits(self):
+        """Test recategorising, flagging or swapping a case wallet changes the key."""
+        seen = {self.fingerprint()}
+
+        self.case_wallet.category = WalletCategory.EXCHANGE
+        self.case_wallet.save()
+        seen.add(self.fingerprint())
+
+        self.case_wallet.flagged = True
+        self.case_wallet.save()
+        seen.add(self.fingerprint())
+
+        self.case_wallet.delete()
+        self.case_wallet.pk = None
+        self.case_wallet.wallet = self.wallets[1]
+        self.case_wallet.save()
+        seen.add(self.fingerprint())
+
+        self.assertEqual(len(seen), 4)
+
+    def test_fingerprint_tracks_deleting_older_transaction(self):
+        """Test deleting a transaction other than the latest changes the key."""
+        before = self.fingerprint()
+        self.transactions[1].delete()
+        self.assertNotEqual(self.fingerprint(), before)
+
+
+class ChartStreamRoutingTestCase(SimpleTestCase):
+    """Test config.asgi sends exactly the chart_stream route to the raw stream."""
+
+    def test_chart_stream_route_is_matched(self):
+        """Test the reversed chart_stream URL is served by the raw stream."""
+        from config.asgi import is_chart_stream_path
+
+        path = reverse("htmx:chart_stream", args=[7])
+        self.assertTrue(is_chart_stream_path(path))
+        self.assertTrue(is_chart_stream_path("/app" + path, root_path="/app"))
+
+    def test_other_routes_go_to_django(self):
+        """Test neighbouring and unknown paths stay on Django's handler."""
+        from config.asgi import is_chart_stream_path
+
+        for path in [
+            reverse("htmx:case_detail", args=[7]),
+            reverse("htmx:chart_stream", args=[7]) + "extra/",
+            "/htmx/cases/abc/chart-stream/",
+            "/not-a-route/",
+        ]:
+            self.assertFalse(is_chart_stream_path(path), path)
+
+    def test_chart_stream_view_is_async_under_asgi(self):
+        """Test the Django chart_stream view streams asynchronously under ASGI."""
+        from core.views import htmx_chart_stream
+
+        request = AsyncRequestFactory().get(reverse("htmx:chart_stream", args=[7]))
+        self.assertTrue(htmx_chart_stream(request, 7).is_async)
@@ -2,31 +2,48 @@
 HTMX-aware views for rendering HTML partials and handling form submissions.
 """
 
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
-from functools import wraps
+from functools import lru_cache, wraps
 from django.core.paginator import Paginator
 from django.db.models import Q
+from django.db.models.fields.json import KeyTextTransform
 from django.db import models
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
 from django_htmx.http import HttpResponseClientRedirect, trigger_client_event
 from django.utils import timezone
+from django.utils.safestring import mark_safe
+from collections import Counter
 from datetime import timedelta, datetime
 from decimal import Decimal
+import asyncio
 import random
-import json
+import threading
 import time
 
-from portfolio.services import PortfolioService
-from portfolio.models import InvestigationCase, CaseWallet, InvestigationStatus, WalletCategory
+import orjson
+
+from authentication.signals import create_assets, create_transactions, create_wallets
+from portfolio.cache import require_case_access
+from portfolio.services import PortfolioService, invalidate_portfolio_summaries
+from portfolio.sse import SSE_PREFIX, SSE_SUFFIX
+from portfolio.models import (
+    CASE_PATTERN_NAMES, InvestigationCase, CaseWallet, InvestigationStatus, WalletCategory,
+)
 from transactions.models import Transaction
 from wallets.models import User, UserSettings, Wallet
 from core.realtime_simulation import get_simulator
 
+_WALLET_CATEGORY_LABELS = dict(WalletCategory.choices)
+
 
 def demo_or_login_required(view_func):
     """Allow access for authenticated users or demo mode."""
@@ -64,7 +81,6 @@ def htmx_login(request):
     if user is None and '@' in username:
         # If username looks like email, try finding user by email
         try:
-            from wallets.models import User
             email_user = User.objects.get(email=username)
             user = authenticate(request, username=email_user.username, password=password)
         except User.DoesNotExist:
@@ -73,24 +89,10 @@ def htmx_login(request):
     if user is not None:
         login(request, user)
         
-        # Get cases data manually instead of calling the view (which has @login_required)
-        cases = InvestigationCase.objects.filter(investigator=user).prefetch_related('case_wallets__wallet')
-        active_cases_count = cases.filter(status='active').count()
-        total_wallets_count = Wallet.objects.filter(user=user).count()
-        flagged_wallets_count = CaseWallet.objects.filter(case__investigator=user, flagged=True).count()
-        from transactions.models import Transaction
-        total_transactions_count = Transaction.objects.filter(wallet__user=user).count()
-        chains_count = Wallet.objects.filter(user=user).values('chain').distinct().count()
-        
-        context = {
-            'investigation_cases': cases,
-            'active_cases_count': active_cases_count,
-            'total_wallets_count': total_wallets_count,
-            'total_transactions_count': total_transactions_count,
-            'flagged_wallets_count': flagged_wallets_count,
-            'chains_count': chains_count,
-            'show_cases_list': True
-        }
+        # Build the dashboard the same way htmx_cases_list does
+        context = _build_dashboard_context(user, request.GET)
+        context['user_authenticated'] = True
+        context['show_cases_list'] = True
         
         response = render(request, "dashboard.html", context)
         response["X-Auth-Status"] = "authenticated"
@@ -306,13 +308,10 @@ def htmx_dashboard(request):
 def home_view(request):
     """Root view - show cases dashboard for all users, with auth controls."""
     # Ensure CSRF cookie is set
-    from django.middleware.csrf import get_token
     get_token(request)
     
     # Auto-login demo user for interview demo
     if not request.user.is_authenticated:
-        from django.contrib.auth import login
-        from wallets.models import User
         try:
             demo_user = User.objects.get(email='lance@blockhead.consulting')
             if demo_user.is_active:
@@ -374,8 +373,6 @@ def htmx_settings(request):
 @require_http_methods(["GET", "POST"])
 def htmx_logout(request):
     """Handle logout and return to homepage."""
-    from django.contrib.auth import logout
-
     logout(request)
     # Return to homepage which will show demo mode
     return htmx_cases_list(request)
@@ -433,6 +430,9 @@ def htmx_register_form(request):
     return htmx_cases_list(request)
 
 
+REFRESH_BATCH_SIZE = 1000
+
+
 @login_required
 @require_http_methods(["POST"])
 def htmx_refresh_mock_data(request):
@@ -445,13 +445,15 @@ def htmx_refresh_mock_data(request):
     except UserSettings.DoesNotExist:
         return HttpResponse('<div class="p-6 text-red-400">User settings not found</div>')
     
-    # Get all user's transactions
-    transactions = Transaction.objects.filter(wallet__user=request.user)
+    # Only the IDs are held in memory; model instances are built per batch below
+    transaction_ids = list(
+        Transaction.objects.filter(
+            wallet__user=request.user
+        ).order_by('timestamp').values_list('id', flat=True)
+    )
     
-    if not transactions.exists():
+    if not transaction_ids:
         # No transactions to update - create new mock data
-        from authentication.signals import create_assets, create_wallets, create_transactions
-        
         # Create assets if they don't exist
         assets = create_assets()
         
@@ -467,9 +469,7 @@ def htmx_refresh_mock_data(request):
         end_date = timezone.now()
         start_date = end_date - timedelta(days=30)
         
-        # Get all transactions ordered by timestamp
-        transactions = transactions.order_by('timestamp')
-        total_transactions = transactions.count()
+        total_transactions = len(transaction_ids)
         
         # Calculate time interval between transactions
         if total_transactions > 1:
@@ -477,11 +477,17 @@ def htmx_refresh_mock_data(request):
         else:
             time_interval = timedelta(hours=1)
         
-        # Update each transaction with a new timestamp
-        for i, transaction in enumerate(transactions):
-            new_timestamp = start_date + (time_interval * i)
-            transaction.timestamp = new_timestamp
-            transaction.save(update_fields=['timestamp'])
+        # Spread the timestamps evenly and write them back one batch at a time
+        for offset in range(0, total_transactions, REFRESH_BATCH_SIZE):
+            batch = [
+                Transaction(id=tx_id, timestamp=start_date + (time_interval * i))
+                for i, tx_id in enumerate(
+                    transaction_ids[offset:offset + REFRESH_BATCH_SIZE], start=offset
+                )
+            ]
+            Transaction.objects.bulk_update(batch, ['timestamp'])
+        # bulk_update sends no post_save, so drop the cached summary here
+        invalidate_portfolio_summaries([request.user.id])
     
     # Return updated settings page with success message
     return HttpResponse('<div class="p-6 text-green-400">Mock data has been refreshed with recent dates!</div>')
@@ -489,49 +495,57 @@ def htmx_refresh_mock_data(request):
 
 # Investigation Case Views
 
-@require_http_methods(["GET"])
-def htmx_cases_list(request):
-    """Return the list of investigation cases with filtering and stats - public or authenticated."""
-    if request.user.is_authenticated:
-        cases = InvestigationCase.objects.filter(
-            investigator=request.user
-        ).prefetch_related(
-            'case_wallets__wallet',
-            'wallets'  # Prefetch wallets for wallet_count property
-        ).annotate(
-            _wallet_count=models.Count('wallets', distinct=True),
-            _flagged_count=models.Count('case_wallets', filter=models.Q(case_wallets__flagged=True))
+CASES_PER_PAGE = 24
+
+
+def _with_grid_relations(cases):
+    """Attach the relations and counts the dashboard grid cards render."""
+    # The grid never shows notes, so skip loading the TEXT column
+    return cases.select_related(
+        'investigator'
+    ).with_wallets().with_counts().annotate(
+        # distinct: the transaction count join repeats each case wallet row
+        _flagged_count=models.Count(
+            'case_wallets', filter=models.Q(case_wallets__flagged=True), distinct=True
         )
-        user_wallets = Wallet.objects.filter(user=request.user)
-        user_transactions = Transaction.objects.filter(wallet__user=request.user)
-        is_demo_mode = False
-    else:
-        # Demo mode - show demo user's cases
-        try:
-            from wallets.models import User
-            demo_user = User.objects.get(email='lance@blockhead.consulting')
-            cases = InvestigationCase.objects.filter(
-                investigator=demo_user
-            ).prefetch_related(
-                'case_wallets__wallet',
-                'wallets'
-            ).annotate(
-                _wallet_count=models.Count('wallets', distinct=True),
-                _flagged_count=models.Count('case_wallets', filter=models.Q(case_wallets__flagged=True))
-            )
-            user_wallets = Wallet.objects.filter(user=demo_user)
-            user_transactions = Transaction.objects.filter(wallet__user=demo_user)
-        except User.DoesNotExist:
-            # Fallback if demo user doesn't exist
-            cases = InvestigationCase.objects.none()
-            user_wallets = Wallet.objects.none()
-            user_transactions = Transaction.objects.none()
-        is_demo_mode = True
+    ).defer('notes')
+
+
+def _paginate_cases(cases, page_number):
+    """Paginate case IDs first, then load relations for the current page only."""
+    paginator = Paginator(cases.values_list('id', flat=True), CASES_PER_PAGE)
+    page_obj = paginator.get_page(page_number)
     
-    # Calculate dashboard stats before any slicing
-    active_cases_count = cases.filter(status='active').count()
+    page_ids = list(page_obj.object_list)
+    loaded = _with_grid_relations(InvestigationCase.objects.filter(id__in=page_ids)).in_bulk()
+    page_obj.object_list = [loaded[case_id] for case_id in page_ids if case_id in loaded]
+    return page_obj
+
+
+def _build_dashboard_context(owner, params):
+    """Build the cases grid page and dashboard stats for ``owner``.
+    
+    ``owner`` may be None (e.g. the demo user is missing), in which case an
+    empty dashboard is returned. ``params`` holds the search/status/priority
+    filters and the page number.
+    """
+    if owner is not None:
+        base_cases = InvestigationCase.objects.filter(investigator=owner)
+        user_wallets = Wallet.objects.filter(user=owner)
+        user_transactions = Transaction.objects.filter(wallet__user=owner)
+    else:
+        base_cases = InvestigationCase.objects.none()
+        user_wallets = Wallet.objects.none()
+        user_transactions = Transaction.objects.none()
+    
+    # Calculate case stats over the unfiltered cases in one aggregate
+    case_stats = base_cases.aggregate(
+        active=models.Count('id', filter=Q(status='active'), distinct=True),
+        flagged=models.Count('case_wallets', filter=Q(case_wallets__flagged=True)),
+    )
+    active_cases_count = case_stats['active']
+    flagged_wallets_count = case_stats['flagged']
     total_wallets_count = user_wallets.count()
-    flagged_wallets_count = CaseWallet.objects.filter(case__in=cases, flagged=True).count()
     
     # Calculate total transactions
     total_transactions_count = user_transactions.count()
@@ -539,39 +553,85 @@ def htmx_cases_list(request):
     # Count unique chains
     chains_count = user_wallets.values('chain').distinct().count()
     
-    # Apply filters
-    search = request.GET.get('search')
-    status = request.GET.get('status')
-    priority = request.GET.get('priority')
+    # Apply filters to a separate queryset used only for display
+    search = params.get('search')
+    status = params.get('status')
+    priority = params.get('priority')
+    
+    display_cases = base_cases
     
     if search:
-        cases = cases.filter(
+        display_cases = display_cases.filter(
             Q(name__icontains=search) | 
             Q(description__icontains=search) |
             Q(notes__icontains=search)
         )
     
     if status:
-        cases = cases.filter(status=status)
+        display_cases = display_cases.filter(status=status)
     
     if priority:
-        cases = cases.filter(priority=priority)
+        display_cases = display_cases.filter(priority=priority)
     
-    # Don't limit cases in demo mode - show all available cases
-    # This ensures the statistics match what's displayed
-    # if is_demo_mode:
-    #     cases = cases[:10]
+    # Only the current page gets its wallets prefetched
+    page_obj = _paginate_cases(display_cases, params.get('page', 1))
     
-    context = {
-        'investigation_cases': cases,
+    # Keep active filters on the pagination links
+    filter_params = params.copy()
+    filter_params.pop('page', None)
+    
+    return {
+        'investigation_cases': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'filter_querystring': filter_params.urlencode(),
         'active_cases_count': active_cases_count,
         'total_wallets_count': total_wallets_count,
         'total_transactions_count': total_transactions_count,
         'flagged_wallets_count': flagged_wallets_count,
         'chains_count': chains_count,
-        'is_demo_mode': is_demo_mode,
-        'user_authenticated': request.user.is_authenticated,
     }
+
+
+DEMO_GRID_CACHE_KEY = "demo_cases_grid_html"
+DEMO_GRID_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+def _render_demo_cases_grid():
+    """Render the unfiltered demo cases grid (first page) to HTML."""
+    demo_user = User.objects.filter(email='lance@blockhead.consulting').first()
+    context = _build_dashboard_context(demo_user, QueryDict())
+    context['is_demo_mode'] = True
+    context['user_authenticated'] = False
+    return render_to_string("partials/cases_grid.html", context)
+
+
+@require_http_methods(["GET"])
+def htmx_cases_list(request):
+    """Return the list of investigation cases with filtering and stats - public or authenticated."""
+    if not request.user.is_authenticated and not request.GET:
+        # The public landing grid is identical for every visitor, so serve it from cache
+        grid_html = mark_safe(cache.get_or_set(
+            DEMO_GRID_CACHE_KEY, _render_demo_cases_grid, DEMO_GRID_CACHE_TIMEOUT
+        ))
+        if request.htmx:
+            return HttpResponse(grid_html)
+        return render(request, "dashboard.html", {
+            'show_cases_list': True,
+            'cases_grid_html': grid_html,
+        })
+    
+    if request.user.is_authenticated:
+        owner = request.user
+        is_demo_mode = False
+    else:
+        # Demo mode - show demo user's cases
+        owner = User.objects.filter(email='lance@blockhead.consulting').first()
+        is_demo_mode = True
+    
+    context = _build_dashboard_context(owner, request.GET)
+    context['is_demo_mode'] = is_demo_mode
+    context['user_authenticated'] = request.user.is_authenticated
     
     # Return grid view - use dashboard.html for full page, cases_grid.html for HTMX partial
     if request.htmx:
@@ -653,6 +713,22 @@ def htmx_archive_case(request, case_id):
     return render(request, "partials/cases_list.html", {"cases": cases})
 
 
+# Fixed jitter table for the demo charts so repeated renders of a case match
+_DEMO_JITTER = tuple(random.Random(1337).random() for _ in range(256))
+
+
+def _demo_randint(case_id, index, low, high, series=0):
+    """Deterministic stand-in for random.randint keyed by case and data point."""
+    jitter = _DEMO_JITTER[(case_id * 31 + series * 97 + index) % len(_DEMO_JITTER)]
+    return low + int(jitter * (high - low + 1))
+
+
+# Columns rendered by the case dashboard's recent transactions table
+RECENT_TRANSACTION_FIELDS = (
+    'id', 'timestamp', 'transaction_type', 'amount', 'usd_value', 'wallet__chain',
+)
+
+
 @require_http_methods(["GET"])
 def htmx_case_detail(request, case_id):
     """Display case investigation dashboard."""
@@ -661,10 +737,10 @@ def htmx_case_detail(request, case_id):
     else:
         # Demo mode - allow viewing any case
         case = get_object_or_404(InvestigationCase, id=case_id)
-    case_wallets = CaseWallet.objects.filter(case=case).select_related('wallet').prefetch_related('wallet__transactions')
+    case_wallets = list(CaseWallet.objects.filter(case=case).select_related('wallet'))
     
-    # Get wallet IDs for this case
-    wallet_ids = case_wallets.values_list('wallet_id', flat=True)
+    # Get wallet IDs for this case from the rows already loaded
+    wallet_ids = [cw.wallet_id for cw in case_wallets]
     
     # Calculate metrics
     if wallet_ids:
@@ -677,26 +753,40 @@ def htmx_case_detail(request, case_id):
             # Demo mode - show sample transactions
             transactions = Transaction.objects.all()[:100]
     
-    transaction_count = transactions.count()
-    
-    # Calculate total value
-    total_value = transactions.aggregate(
-        total=models.Sum('usd_value')
-    )['total'] or Decimal('0')
+    # Count, total value and latest activity in a single aggregate
+    metrics = transactions.aggregate(
+        count=models.Count('id'),
+        total=models.Sum('usd_value'),
+        latest=models.Max('timestamp'),
+    )
+    transaction_count = metrics['count']
+    total_value = metrics['total'] or Decimal('0')
+    
+    # Changes whenever a transaction is added or deleted, a wallet is edited, or
+    # a case wallet is added, swapped, recategorised or (un)flagged, so the
+    # cached recent transactions table is rebuilt only when needed
+    cache_fingerprint = '{}:{}:{}:{}'.format(
+        metrics['count'],
+        metrics['latest'].timestamp() if metrics['latest'] else 0,
+        max((cw.wallet.updated_at.timestamp() for cw in case_wallets), default=0),
+        ','.join(
+            f'{cw.pk}-{cw.wallet_id}-{cw.category}-{int(cw.flagged)}' for cw in case_wallets
+        ),
+    )
     
     # Count suspicious transactions (those with patterns in metadata)
     suspicious_count = transactions.exclude(
         metadata__pattern__isnull=True
     ).count()
     
-    # Get wallet distribution by category
-    wallet_distribution = list(case_wallets.values('category').annotate(
-        count=models.Count('id')
-    ).order_by('category'))
+    # Get wallet distribution by category from the case wallets already loaded
+    category_counts = Counter(cw.category for cw in case_wallets)
     
     # Format wallet distribution for chart
-    for item in wallet_distribution:
-        item['category'] = dict(WalletCategory.choices).get(item['category'], 'Unknown')
+    wallet_distribution = [
+        {'category': _WALLET_CATEGORY_LABELS.get(category, 'Unknown'), 'count': count}
+        for category, count in sorted(category_counts.items())
+    ]
     
     # Get real-time simulation data for charts
     simulator = get_simulator()
@@ -709,48 +799,58 @@ def htmx_case_detail(request, case_id):
     ethereum_data = sim_data['multi_chain_data'].get('ethereum', {'balances': [], 'volume': []})
     arbitrum_data = sim_data['multi_chain_data'].get('arbitrum', {'balances': [], 'volume': []})
     
-    # Create realistic inflow/outflow from simulation data
-    inflow_data = []
-    outflow_data = []
-    
-    for i in range(len(flow_labels)):
-        # Inflow from simulation volume data
-        eth_volume = ethereum_data['volume'][i] if i < len(ethereum_data['volume']) else 50000
-        arb_volume = arbitrum_data['volume'][i] if i < len(arbitrum_data['volume']) else 20000
-        
-        # Simulate inflow (money coming in) and outflow (money going out)
-        inflow = eth_volume + random.randint(10000, 50000)
-        outflow = arb_volume + random.randint(5000, 30000)
-        
-        inflow_data.append(inflow)
-        outflow_data.append(outflow)
-    
-    # Timeline data (transactions per period)
+    # Pad the simulator volume series to the label count once, up front
+    num_points = len(flow_labels)
+    eth_volumes = (list(ethereum_data['volume']) + [50000] * num_points)[:num_points]
+    arb_volumes = (list(arbitrum_data['volume']) + [20000] * num_points)[:num_points]
+    
+    # Simulate inflow (money coming in) and outflow (money going out)
+    inflow_data = [
+        eth_volume + _demo_randint(case.id, i, 10000, 50000, series=0)
+        for i, eth_volume in enumerate(eth_volumes)
+    ]
+    outflow_data = [
+        arb_volume + _demo_randint(case.id, i, 5000, 30000, series=1)
+        for i, arb_volume in enumerate(arb_volumes)
+    ]
+    
+    # Timeline data (transactions per period): a base count plus variance
     timeline_labels = flow_labels
-    timeline_data = []
-    
-    for i in range(len(timeline_labels)):
-        # Use simulation data to create realistic transaction counts
-        base_count = random.randint(5, 25)
-        # Add variance based on simulation activity
-        variance = random.randint(-5, 10)
-        count = max(1, base_count + variance)
-        timeline_data.append(count)
+    timeline_data = [
+        max(
+            1,
+            _demo_randint(case.id, i, 5, 25, series=2)
+            + _demo_randint(case.id, i, -5, 10, series=3),
+        )
+        for i in range(num_points)
+    ]
     
     # Get recent transactions for case wallets
     if wallet_ids:
-        recent_transactions = transactions.select_related('wallet').order_by('-timestamp')[:10]
+        recent_transactions = transactions.select_related('wallet').only(
+            *RECENT_TRANSACTION_FIELDS
+        ).order_by('-timestamp')[:10]
     else:
         # Show recent user transactions if no case wallets
         if request.user.is_authenticated:
             recent_transactions = Transaction.objects.filter(
                 wallet__user=request.user
-            ).select_related('wallet').order_by('-timestamp')[:10]
+            ).select_related('wallet').only(*RECENT_TRANSACTION_FIELDS).order_by('-timestamp')[:10]
         else:
             # Demo mode - show sample transactions
-            recent_transactions = Transaction.objects.all().select_related('wallet').order_by('-timestamp')[:10]
-    
-    import json
+            recent_transactions = Transaction.objects.all().select_related('wallet').only(
+                *RECENT_TRANSACTION_FIELDS
+            ).order_by('-timestamp')[:10]
+    
+    # Serialize every chart series in one pass
+    chart_data = {
+        "wallet_distribution": wallet_distribution,
+        "flow_labels": flow_labels,
+        "inflow_data": inflow_data,
+        "outflow_data": outflow_data,
+        "timeline_data": timeline_data,
+        "timeline_labels": timeline_labels,
+    }
     
     context = {
         "case": case,
@@ -759,18 +859,21 @@ def htmx_case_detail(request, case_id):
         "transaction_count": transaction_count,
         "total_value": total_value,
         "suspicious_count": suspicious_count,
+        "cache_fingerprint": cache_fingerprint,
         "wallet_categories": WalletCategory.choices,
-        "wallet_distribution": json.dumps(wallet_distribution),
-        "flow_labels": json.dumps(flow_labels),
-        "inflow_data": json.dumps(inflow_data),
-        "outflow_data": json.dumps(outflow_data),
-        "timeline_data": json.dumps(timeline_data),
-        "timeline_labels": json.dumps(timeline_labels),
+        "chart_data_json": orjson.dumps(chart_data).decode(),
     }
     
     return render(request, "partials/case_dashboard_working.html", context)
 
 
+# Columns rendered by the case transactions table
+CASE_TRANSACTION_FIELDS = (
+    'id', 'tx_hash', 'timestamp', 'transaction_type', 'amount', 'asset_symbol', 'usd_value',
+    'wallet__address', 'wallet__chain', 'wallet__label',
+)
+
+
 @require_http_methods(["GET"])
 def htmx_case_transactions(request, case_id):
     """Get paginated transactions for a case."""
@@ -794,10 +897,12 @@ def htmx_case_transactions(request, case_id):
             # Get real transactions for these wallets
             transactions = Transaction.objects.filter(
                 wallet_id__in=wallet_ids
-            ).select_related('wallet').order_by('-timestamp')
+            ).select_related('wallet').only(*CASE_TRANSACTION_FIELDS).order_by('-timestamp')
         else:
             # Fallback to all transactions if no wallets in case
-            transactions = Transaction.objects.all().select_related('wallet').order_by('-timestamp')[:100]
+            transactions = Transaction.objects.all().select_related('wallet').only(
+                *CASE_TRANSACTION_FIELDS
+            ).order_by('-timestamp')[:100]
         
         # Create a manual paginator
         paginator = Paginator(transactions, 20)
@@ -814,12 +919,12 @@ def htmx_case_transactions(request, case_id):
         if wallet_ids:
             transactions = Transaction.objects.filter(
                 wallet_id__in=wallet_ids
-            ).select_related('wallet').order_by('-timestamp')
+            ).select_related('wallet').only(*CASE_TRANSACTION_FIELDS).order_by('-timestamp')
         else:
             # If no wallets in case, show all user transactions as fallback
             transactions = Transaction.objects.filter(
                 wallet__user=request.user
-            ).select_related('wallet').order_by('-timestamp')
+            ).select_related('wallet').only(*CASE_TRANSACTION_FIELDS).order_by('-timestamp')
         
         # Paginate
         paginator = Paginator(transactions, 20)
@@ -843,35 +948,33 @@ def htmx_case_transactions(request, case_id):
 def htmx_case_wallet_analysis(request, case_id):
     """Analyze wallets in a case."""
     case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
-    case_wallets = CaseWallet.objects.filter(case=case).select_related('wallet')
+    # Per-wallet flows, counts and last activity in one grouped query instead
+    # of four queries per wallet
+    case_wallets = CaseWallet.objects.filter(case=case).select_related('wallet').annotate(
+        total_in=models.Sum(
+            'wallet__transactions__usd_value',
+            filter=Q(wallet__transactions__transaction_type__in=['buy', 'transfer']),
+        ),
+        total_out=models.Sum(
+            'wallet__transactions__usd_value',
+            filter=Q(wallet__transactions__transaction_type='sell'),
+        ),
+        tx_count=models.Count('wallet__transactions'),
+        last_activity=models.Max('wallet__transactions__timestamp'),
+    )
     
     wallet_analysis = []
     for cw in case_wallets:
-        wallet = cw.wallet
-        transactions = Transaction.objects.filter(wallet=wallet)
-        
-        # Calculate wallet metrics
-        total_in = transactions.filter(
-            transaction_type__in=['buy', 'transfer']
-        ).aggregate(total=models.Sum('usd_value'))['total'] or 0
-        
-        total_out = transactions.filter(
-            transaction_type='sell'
-        ).aggregate(total=models.Sum('usd_value'))['total'] or 0
-        
-        balance_estimate = total_in - total_out
-        tx_count = transactions.count()
-        
-        # Get last activity
-        last_tx = transactions.order_by('-timestamp').first()
+        total_in = cw.total_in or 0
+        total_out = cw.total_out or 0
         
         wallet_analysis.append({
             'case_wallet': cw,
             'total_in': total_in,
             'total_out': total_out,
-            'balance_estimate': balance_estimate,
-            'tx_count': tx_count,
-            'last_activity': last_tx.timestamp if last_tx else None,
+            'balance_estimate': total_in - total_out,
+            'tx_count': cw.tx_count,
+            'last_activity': cw.last_activity,
         })
     
     context = {
@@ -882,6 +985,9 @@ def htmx_case_wallet_analysis(request, case_id):
     return render(request, "partials/case_wallet_analysis.html", context)
 
 
+PATTERN_SAMPLE_SIZE = 20
+
+
 @login_required
 @require_http_methods(["GET"])
 def htmx_case_suspicious_patterns(request, case_id):
@@ -895,20 +1001,31 @@ def htmx_case_suspicious_patterns(request, case_id):
         wallet_id__in=wallet_ids
     ).exclude(
         metadata__pattern__isnull=True
-    ).select_related('wallet').order_by('-timestamp')
+    )
+    
+    # Group by pattern type in the database
+    pattern_counts = list(
+        suspicious_transactions.annotate(
+            pattern=KeyTextTransform('pattern', 'metadata')
+        ).values('pattern').annotate(
+            count=models.Count('id')
+        ).order_by('-count')
+    )
     
-    # Group by pattern type
+    # Only load a bounded sample of transactions for each pattern
     patterns = {}
-    for tx in suspicious_transactions:
-        pattern = tx.metadata.get('pattern', 'unknown')
-        if pattern not in patterns:
-            patterns[pattern] = []
-        patterns[pattern].append(tx)
+    for row in pattern_counts:
+        patterns[row['pattern'] or 'unknown'] = list(
+            suspicious_transactions.filter(
+                metadata__pattern=row['pattern']
+            ).select_related('wallet').order_by('-timestamp')[:PATTERN_SAMPLE_SIZE]
+        )
     
     context = {
         'case': case,
         'patterns': patterns,
-        'suspicious_count': suspicious_transactions.count(),
+        'pattern_counts': {row['pattern'] or 'unknown': row['count'] for row in pattern_counts},
+        'suspicious_count': sum(row['count'] for row in pattern_counts),
     }
     
     return render(request, "partials/case_suspicious_patterns.html", context)
@@ -927,6 +1044,43 @@ def htmx_update_case_notes(request, case_id):
     return HttpResponse('<div class="uk-alert-success" uk-alert>Notes saved successfully!</div>')
 
 
+# Context for the partials/case_toast.html notifications
+CASE_TOASTS = {
+    "wallet_added": {
+        "color": "green",
+        "icon_path": "M5 13l4 4L19 7",
+        "title": "Wallet Added",
+        "message": "Wallet successfully added to case",
+    },
+    "export_complete": {
+        "color": "green",
+        "icon_path": "M5 13l4 4L19 7",
+        "title": "Export Complete",
+        "message": "Case data exported successfully",
+    },
+    "report_generated": {
+        "color": "blue",
+        "icon_path": "M9 17v-2m3 2v-4m3 4v-6m2 10H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z",
+        "title": "Report Generated",
+        "message": "Comprehensive analysis ready for download",
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def _case_toast_html(kind):
+    """Render a case toast once; the markup never varies per request."""
+    return render_to_string("partials/case_toast.html", CASE_TOASTS[kind]).encode()
+
+
+@lru_cache(maxsize=1024)
+def _add_wallet_form_html(case_id):
+    """Render the add-wallet modal once per case; only the form URL varies."""
+    return render_to_string(
+        "partials/case_add_wallet_form.html", {"case_id": case_id}
+    ).encode()
+
+
 @login_required
 @require_http_methods(["POST"])
 def htmx_add_wallet_to_case(request, case_id):
@@ -962,26 +1116,7 @@ def htmx_add_wallet_to_case(request, case_id):
     )
     
     # Clear modal and return success message
-    success_message = f"""
-    <div class="fixed top-4 right-4 bg-green-600 text-white p-4 rounded-lg shadow-lg max-w-sm z-50">
-        <div class="flex items-start space-x-3">
-            <svg class="w-5 h-5 text-green-200 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"/>
-            </svg>
-            <div>
-                <p class="font-semibold">Wallet Added</p>
-                <p class="text-sm text-green-100">Wallet successfully added to case</p>
-            </div>
-        </div>
-    </div>
-    <script>
-        setTimeout(() => {{
-            document.querySelector('.fixed.top-4.right-4').remove();
-        }}, 3000);
-    </script>
-    """
-    
-    return HttpResponse(success_message)
+    return HttpResponse(_case_toast_html("wallet_added"))
 
 
 @demo_or_login_required
@@ -1000,96 +1135,20 @@ def htmx_add_wallet_to_case_form(request, case_id):
             '</div></div>'
         )
     
-    case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
-    
-    form_html = f"""
-    <div class="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50">
-        <div class="bg-gray-800 rounded-xl p-8 max-w-md w-full mx-4">
-            <h3 class="text-xl font-semibold text-white mb-6">Add Wallet to Case</h3>
-            <form hx-post="/htmx/cases/{case_id}/add-wallet/" hx-target="#modal-container" hx-swap="innerHTML">
-                <div class="space-y-4">
-                    <div>
-                        <label class="block text-sm font-medium text-gray-300 mb-2">Wallet Address</label>
-                        <input type="text" name="address" required 
-                               class="w-full px-4 py-3 bg-gray-700 border border-gray-600 rounded-lg text-white placeholder-gray-400 focus:ring-2 focus:ring-blue-500 focus:border-transparent"
-                               placeholder="0x...">
-                    </div>
-                    <div>
-                        <label class="block text-sm font-medium text-gray-300 mb-2">Chain</label>
-                        <select name="chain" required class="w-full px-4 py-3 bg-gray-700 border border-gray-600 rounded-lg text-white focus:ring-2 focus:ring-blue-500 focus:border-transparent">
-                            <option value="">Select Chain</option>
-                            <option value="ethereum">Ethereum</option>
-                            <option value="arbitrum">Arbitrum</option>
-                            <option value="optimism">Optimism</option>
-                            <option value="polygon">Polygon</option>
-                        </select>
-                    </div>
-                    <div>
-                        <label class="block text-sm font-medium text-gray-300 mb-2">Label (Optional)</label>
-                        <input type="text" name="label" 
-                               class="w-full px-4 py-3 bg-gray-700 border border-gray-600 rounded-lg text-white placeholder-gray-400 focus:ring-2 focus:ring-blue-500 focus:border-transparent"
-                               placeholder="Wallet description">
-                    </div>
-                    <div>
-                        <label class="block text-sm font-medium text-gray-300 mb-2">Category</label>
-                        <select name="category" class="w-full px-4 py-3 bg-gray-700 border border-gray-600 rounded-lg text-white focus:ring-2 focus:ring-blue-500 focus:border-transparent">
-                            <option value="unknown">Unknown</option>
-                            <option value="personal">Personal</option>
-                            <option value="exchange">Exchange</option>
-                            <option value="defi">DeFi Protocol</option>
-                            <option value="suspicious">Suspicious</option>
-                        </select>
-                    </div>
-                    <div class="flex items-center">
-                        <input type="checkbox" name="flagged" id="flagged" class="rounded bg-gray-700 border-gray-600 text-blue-600 focus:ring-blue-500 focus:ring-2">
-                        <label for="flagged" class="ml-2 text-sm text-gray-300">Flag as high risk</label>
-                    </div>
-                </div>
-                <div class="flex justify-end space-x-3 mt-6">
-                    <button type="button" onclick="document.getElementById('modal-container').innerHTML = ''" 
-                            class="px-4 py-2 bg-gray-700 hover:bg-gray-600 text-white rounded-lg font-medium transition-colors">
-                        Cancel
-                    </button>
-                    <button type="submit" class="px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white rounded-lg font-medium transition-colors">
-                        Add Wallet
-                    </button>
-                </div>
-            </form>
-        </div>
-    </div>
-    """
+    require_case_access(case_id, request.user)
     
-    return HttpResponse(form_html)
+    return HttpResponse(_add_wallet_form_html(case_id))
 
 
 @login_required
 @require_http_methods(["POST"])
 def htmx_export_case_data(request, case_id):
     """Export case data to CSV."""
-    case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
+    require_case_access(case_id, request.user)
     
     # This would normally generate and return a CSV file
     # For now, return a success message
-    message = f"""
-    <div class="fixed top-4 right-4 bg-green-600 text-white p-4 rounded-lg shadow-lg max-w-sm z-50">
-        <div class="flex items-start space-x-3">
-            <svg class="w-5 h-5 text-green-200 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"/>
-            </svg>
-            <div>
-                <p class="font-semibold">Export Complete</p>
-                <p class="text-sm text-green-100">Case data exported successfully</p>
-            </div>
-        </div>
-    </div>
-    <script>
-        setTimeout(() => {{
-            document.querySelector('.fixed.top-4.right-4').remove();
-        }}, 3000);
-    </script>
-    """
-    
-    return HttpResponse(message)
+    return HttpResponse(_case_toast_html("export_complete"))
 
 
 @demo_or_login_required
@@ -1097,33 +1156,14 @@ def htmx_export_case_data(request, case_id):
 def htmx_generate_case_report(request, case_id):
     """Generate comprehensive case report."""
     if request.user.is_authenticated:
-        case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
+        require_case_access(case_id, request.user)
     else:
         # Demo mode - show message only
-        case = get_object_or_404(InvestigationCase, id=case_id)
+        require_case_access(case_id)
     
     # This would normally generate a PDF report
     # For now, return a success message
-    message = f"""
-    <div class="fixed top-4 right-4 bg-blue-600 text-white p-4 rounded-lg shadow-lg max-w-sm z-50">
-        <div class="flex items-start space-x-3">
-            <svg class="w-5 h-5 text-blue-200 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 17v-2m3 2v-4m3 4v-6m2 10H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z"/>
-            </svg>
-            <div>
-                <p class="font-semibold">Report Generated</p>
-                <p class="text-sm text-blue-100">Comprehensive analysis ready for download</p>
-            </div>
-        </div>
-    </div>
-    <script>
-        setTimeout(() => {{
-            document.querySelector('.fixed.top-4.right-4').remove();
-        }}, 3000);
-    </script>
-    """
-    
-    return HttpResponse(message)
+    return HttpResponse(_case_toast_html("report_generated"))
 
 
 @require_http_methods(["GET"])
@@ -1131,64 +1171,130 @@ def htmx_chart_data(request, case_id, timeframe):
     """Return JSON chart data from real-time blockchain simulation."""
     # Allow access for demo mode or authenticated users
     if request.user.is_authenticated:
-        case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
+        require_case_access(case_id, request.user)
     else:
         # Demo mode - allow access to any case
-        case = get_object_or_404(InvestigationCase, id=case_id)
+        require_case_access(case_id)
     # Get real-time simulation data
     simulator = get_simulator()
     simulation_data = simulator.get_current_data(timeframe)
     
     # Return the simulation data directly
     return HttpResponse(
-        json.dumps(simulation_data),
+        orjson.dumps(simulation_data),
         content_type='application/json'
     )
 
 
+CHART_STREAM_INTERVAL = 1  # seconds between SSE chart updates
+
+
+# Shared (expires_at, event) snapshot so every subscriber reuses one tick
+_chart_snapshot = (0.0, b"")
+_chart_snapshot_lock = threading.Lock()
+
+
+def _chart_stream_event():
+    """Return the current 1 minute simulation window as an SSE event.
+
+    The event is computed at most once per interval and broadcast to every
+    connected client, so simulator and JSON work no longer scale with the
+    number of open dashboards.
+    """
+    global _chart_snapshot
+    now = time.monotonic()
+    expires_at, event = _chart_snapshot
+    if now < expires_at:
+        return event
+
+    with _chart_snapshot_lock:
+        expires_at, event = _chart_snapshot
+        if now >= expires_at:
+            data = get_simulator().get_current_data('1M')
+            event = SSE_PREFIX + orjson.dumps(data) + SSE_SUFFIX
+            _chart_snapshot = (now + CHART_STREAM_INTERVAL, event)
+    return event
+
+
+async def _async_chart_stream():
+    while True:
+        yield _chart_stream_event()
+        await asyncio.sleep(CHART_STREAM_INTERVAL)
+
+
+def _sync_chart_stream():
+    while True:
+        yield _chart_stream_event()
+        time.sleep(CHART_STREAM_INTERVAL)
+
+
 @require_http_methods(["GET"])
 def htmx_chart_stream(request, case_id):
-    """Server-Sent Events endpoint for real-time chart updates."""
-    def event_stream():
-        simulator = get_simulator()
-        
-        while True:
-            # Get current simulation data with 1 minute timeframe
-            data = simulator.get_current_data('1M')
-            
-            # Format as SSE
-            yield f"data: {json.dumps(data)}\n\n"
-            
-            # Update every second for real-time effect
-            time.sleep(1)
-    
-    response = HttpResponse(event_stream(), content_type='text/event-stream')
+    """Server-Sent Events endpoint for real-time chart updates.
+
+    Under ASGI the stream sleeps on the event loop, so idle subscribers do not
+    pin a worker thread. The blocking generator remains for WSGI (runserver).
+    """
+    if isinstance(request, ASGIRequest):
+        event_stream = _async_chart_stream()
+    else:
+        event_stream = _sync_chart_stream()
+
+    response = StreamingHttpResponse(event_stream, content_type='text/event-stream')
     response['Cache-Control'] = 'no-cache'
-    response['Connection'] = 'keep-alive'
     response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
     return response
 
 
+CHART_STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+async def chart_stream_asgi(scope, receive, send):
+    """Raw ASGI equivalent of htmx_chart_stream, mounted in config.asgi.
+
+    The stream is public and never completes, so it skips Django's request
+    and middleware stack entirely and writes frames straight to ``send``.
+    Waiting on the disconnect watcher doubles as the tick sleep.
+    """
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': CHART_STREAM_HEADERS,
+    })
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        while not disconnected.done():
+            await send({
+                'type': 'http.response.body',
+                'body': _chart_stream_event(),
+                'more_body': True,
+            })
+            await asyncio.wait([disconnected], timeout=CHART_STREAM_INTERVAL)
+    finally:
+        disconnected.cancel()
+
+
 @login_required
 @require_http_methods(["GET"])
 def htmx_case_by_pattern(request, pattern):
     """Quick access to case by pattern name"""
-    pattern_map = {
-        "arbitrage": "Arbitrage Bot Strategy Tracker",
-        "defi": "DeFi Yield Farming Monitor", 
-        "mev": "Cross-Chain MEV Analysis"
-    }
-    
-    case_name = pattern_map.get(pattern)
-    if not case_name:
+    if pattern not in CASE_PATTERN_NAMES:
         return htmx_cases_list(request)
-        
-    case = InvestigationCase.objects.filter(
+
+    case_id = InvestigationCase.objects.filter(
         investigator=request.user,
-        name__icontains=case_name
-    ).first()
-    
-    if case:
-        return htmx_case_detail(request, case.id)
+        pattern_slug=pattern
+    ).values_list('id', flat=True).first()
+
+    if case_id:
+        return htmx_case_detail(request, case_id)
     else:
         return htmx_cases_list(request)
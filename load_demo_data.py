@@ -10,8 +10,9 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
-from django.contrib.auth import get_user_model
-from django.core.management import call_command
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import transaction  # noqa: E402
 
 User = get_user_model()
 
@@ -27,18 +28,25 @@ def load_demo_data():
         print("Empty database detected. Generating fresh demo data...")
         
         try:
-            # Generate all demo data
-            print("1. Generating users and wallets...")
-            call_command('generate_mock_data', '--superusers', '1', '--users', '5', '--transactions', '100')
-            print("✓ Users and wallets created")
-            
-            print("2. Generating investigation cases...")
-            call_command('generate_investigation_data')
-            print("✓ Investigation cases created")
-            
-            print("3. Generating portfolio cases...")
-            call_command('generate_portfolio_cases')
-            print("✓ Portfolio cases created")
+            # Generate all demo data in one transaction: a single commit
+            # instead of one per row, and no half-seeded database on failure
+            with transaction.atomic():
+                print("1. Generating users and wallets...")
+                call_command(
+                    'generate_mock_data',
+                    '--superusers', '1',
+                    '--users', '5',
+                    '--transactions', '100',
+                )
+                print("✓ Users and wallets created")
+                
+                print("2. Generating investigation cases...")
+                call_command('generate_investigation_data')
+                print("✓ Investigation cases created")
+                
+                print("3. Generating portfolio cases...")
+                call_command('generate_portfolio_cases')
+                print("✓ Portfolio cases created")
             
             print("Demo data generated successfully!")
         except Exception as e:
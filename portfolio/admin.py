@@ -8,10 +8,15 @@ class CaseWalletInline(admin.TabularInline):
     readonly_fields = ('added_at',)
     autocomplete_fields = ['wallet']
 
+    def get_queryset(self, request):
+        # Inline rows are labelled with CaseWallet.__str__, which reads both relations
+        return super().get_queryset(request).for_list()
+
 
 @admin.register(InvestigationCase)
 class InvestigationCaseAdmin(admin.ModelAdmin):
     list_display = ('name', 'investigator', 'status', 'priority', 'wallet_count', 'created_at')
+    list_select_related = ('investigator',)
     list_filter = ('status', 'priority', 'created_at')
     search_fields = ('name', 'description', 'notes')
     readonly_fields = ('created_at', 'updated_at', 'wallet_count', 'transaction_count')
@@ -31,7 +36,7 @@ class InvestigationCaseAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        queryset = super().get_queryset(request)
+        queryset = super().get_queryset(request).with_counts()
         if not request.user.is_superuser:
             queryset = queryset.filter(investigator=request.user)
         return queryset
\ No newline at end of file
@@ -1,6 +1,8 @@
+from operator import itemgetter
 from typing import List, Optional
 
-from django.http import StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from ninja import Router, Schema
 
@@ -9,7 +11,7 @@ from wallets.models import Wallet
 
 from .models import InvestigationCase, CaseWallet, InvestigationStatus, WalletCategory
 from .services import PortfolioService
-from .sse import portfolio_sse_stream
+from .sse import async_portfolio_sse_stream, portfolio_sse_stream
 
 router = Router()
 
@@ -89,24 +91,46 @@ class ErrorSchema(Schema):
 
 # Investigation Case Management Endpoints
 
+# Case columns copied verbatim into InvestigationCaseSchema payloads
+_CASE_VALUE_FIELDS = ("id", "name", "description", "status", "priority", "notes")
+_case_values = itemgetter(*_CASE_VALUE_FIELDS)
+
+
+def _serialize_case(case):
+    """Build the InvestigationCaseSchema payload for a case instance"""
+    return {
+        "id": case.id,
+        "name": case.name,
+        "description": case.description,
+        "status": case.status,
+        "priority": case.priority,
+        "wallet_count": case.wallet_count,
+        "transaction_count": case.transaction_count,
+        "notes": case.notes,
+        "created_at": case.created_at.isoformat(),
+        "updated_at": case.updated_at.isoformat(),
+    }
+
+
 @router.get("/cases", auth=AuthBearer(), response=List[InvestigationCaseSchema])
 def list_investigation_cases(request):
     """List all investigation cases for the authenticated user"""
-    cases = InvestigationCase.objects.filter(investigator=request.user)
+    rows = InvestigationCase.objects.filter(investigator=request.user).with_counts().values(
+        *_CASE_VALUE_FIELDS,
+        "created_at",
+        "updated_at",
+        "_wallet_count",
+        "_transaction_count",
+    )
     return [
-        {
-            "id": case.id,
-            "name": case.name,
-            "description": case.description,
-            "status": case.status,
-            "priority": case.priority,
-            "wallet_count": case.wallet_count,
-            "transaction_count": case.transaction_count,
-            "notes": case.notes,
-            "created_at": case.created_at.isoformat(),
-            "updated_at": case.updated_at.isoformat(),
-        }
-        for case in cases
+        dict(
+            zip(_CASE_VALUE_FIELDS, _case_values(row)),
+            wallet_count=row["_wallet_count"],
+            transaction_count=row["_transaction_count"],
+            created_at=row["created_at"].isoformat(),
+            updated_at=row["updated_at"].isoformat(),
+        )
+        for row in rows
     ]
 
 
@@ -120,59 +144,36 @@ def create_investigation_case(request, data: CreateInvestigationCaseSchema):
         notes=data.notes,
         investigator=request.user,
     )
-    return {
-        "id": case.id,
-        "name": case.name,
-        "description": case.description,
-        "status": case.status,
-        "priority": case.priority,
-        "wallet_count": case.wallet_count,
-        "transaction_count": case.transaction_count,
-        "notes": case.notes,
-        "created_at": case.created_at.isoformat(),
-        "updated_at": case.updated_at.isoformat(),
-    }
+    # A freshly created case has no wallets, so skip the COUNT queries
+    case._wallet_count = case._transaction_count = 0
+    return _serialize_case(case)
 
 
 @router.get("/cases/{case_id}", auth=AuthBearer(), response=InvestigationCaseSchema)
 def get_investigation_case(request, case_id: int):
     """Get a specific investigation case"""
-    case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
-    return {
-        "id": case.id,
-        "name": case.name,
-        "description": case.description,
-        "status": case.status,
-        "priority": case.priority,
-        "wallet_count": case.wallet_count,
-        "transaction_count": case.transaction_count,
-        "notes": case.notes,
-        "created_at": case.created_at.isoformat(),
-        "updated_at": case.updated_at.isoformat(),
-    }
+    case = get_object_or_404(
+        InvestigationCase.objects.with_counts(),
+        id=case_id,
+        investigator=request.user,
+    )
+    return _serialize_case(case)
 
 
 @router.put("/cases/{case_id}", auth=AuthBearer(), response=InvestigationCaseSchema)
 def update_investigation_case(request, case_id: int, data: UpdateInvestigationCaseSchema):
     """Update an investigation case"""
-    case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
+    case = get_object_or_404(
+        InvestigationCase.objects.with_counts(),
+        id=case_id,
+        investigator=request.user,
+    )
     
     for field, value in data.dict(exclude_unset=True).items():
         setattr(case, field, value)
     case.save()
     
-    return {
-        "id": case.id,
-        "name": case.name,
-        "description": case.description,
-        "status": case.status,
-        "priority": case.priority,
-        "wallet_count": case.wallet_count,
-        "transaction_count": case.transaction_count,
-        "notes": case.notes,
-        "created_at": case.created_at.isoformat(),
-        "updated_at": case.updated_at.isoformat(),
-    }
+    return _serialize_case(case)
 
 
 @router.delete("/cases/{case_id}", auth=AuthBearer())
@@ -187,7 +188,20 @@ def delete_investigation_case(request, case_id: int):
 def list_case_wallets(request, case_id: int):
     """List all wallets in a specific investigation case"""
     case = get_object_or_404(InvestigationCase, id=case_id, investigator=request.user)
-    case_wallets = CaseWallet.objects.filter(case=case).select_related('wallet')
+    case_wallets = (
+        CaseWallet.objects.filter(case=case)
+        .select_related("wallet")
+        .only(
+            "category",
+            "notes",
+            "flagged",
+            "added_at",
+            "wallet__id",
+            "wallet__address",
+            "wallet__chain",
+            "wallet__label",
+        )
+    )
     
     return [
         {
@@ -253,8 +267,7 @@ def remove_wallet_from_case(request, case_id: int, wallet_id: int):
 @router.get("/summary", auth=AuthBearer(), response=PortfolioSummarySchema)
 def portfolio_summary(request):
     """Get current portfolio summary (legacy endpoint)"""
-    service = PortfolioService(request.user)
-    return service.get_portfolio_summary()
+    return PortfolioService(request.user).get_portfolio_summary()
 
 
 @router.get("/history", auth=AuthBearer(), response=List[HistoricalDataPointSchema])
@@ -280,15 +293,15 @@ def portfolio_stream(request):
     
     # Check if user is authenticated via Django session
     if not request.user.is_authenticated:
-        from django.http import HttpResponse
         return HttpResponse("Unauthorized", status=401)
 
-    def event_stream():
-        """Generate SSE events"""
-        for data in portfolio_sse_stream(request.user):
-            yield f"data: {data}\n\n"
+    # Under ASGI the stream sleeps on the event loop instead of a worker thread
+    if isinstance(request, ASGIRequest):
+        event_stream = async_portfolio_sse_stream(request.user)
+    else:
+        event_stream = portfolio_sse_stream(request.user)
 
-    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response = StreamingHttpResponse(event_stream, content_type="text/event-stream")
     response["Cache-Control"] = "no-cache"
     response["X-Accel-Buffering"] = "no"  # Disable Nginx buffering
 
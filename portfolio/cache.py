@@ -1,13 +1,111 @@
-from datetime import timedelta
-from typing import Any, Dict, Optional
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, Iterable, Optional
 
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
 from django.utils import timezone
 
 from transactions.models import PortfolioCache, PriceCache
 
+from .models import InvestigationCase
+
+# Crypto prices are considered fresh for 30 seconds
+PRICE_TTL_SECONDS = 30
+
+# Expired rows removed in one sweep before SQLite is asked to reclaim pages
+VACUUM_THRESHOLD = 1000
+
+
+def _portfolio_cache_key(user_id: int, key: str) -> str:
+    return f"portfolio:{user_id}:{key}"
+
+
+def _remaining_seconds(expires_at) -> Optional[float]:
+    """Django cache timeout for a row expiring at ``expires_at``"""
+    if expires_at is None:
+        return None
+    return max((expires_at - timezone.now()).total_seconds(), 0)
+
+
+# Fresh price rows memoized for the current freshness slot only, as
+# {slot: {symbol: price_data}}; a new slot starts from an empty memo
+_price_memo: Dict[int, Dict[str, Dict[str, Any]]] = {}
+
+
+def _price_slot(symbol: str, slot: int) -> Optional[Dict[str, Any]]:
+    """Load fresh price data for ``symbol`` once per freshness window
+
+    Rows count as fresh only if they were written since the slot began, so a
+    memoized price is never older than PRICE_TTL_SECONDS while it is served.
+    Misses are not memoized: a price written by another worker is picked up
+    on the next lookup rather than when the slot rolls over.
+    """
+    prices = _price_memo.get(slot)
+    if prices is None:
+        _price_memo.clear()
+        prices = _price_memo.setdefault(slot, {})
+
+    price_data = prices.get(symbol)
+    if price_data is None:
+        slot_start = datetime.fromtimestamp(slot * PRICE_TTL_SECONDS, tz=dt_timezone.utc)
+        price_data = (
+            PriceCache.objects.filter(symbol=symbol, last_updated__gte=slot_start)
+            .values_list("price_data", flat=True)
+            .first()
+        )
+        if price_data is not None:
+            prices[symbol] = price_data
+    return price_data
+
+
+# Seconds a case ownership lookup is reused across back-to-back HTMX actions
+CASE_LOOKUP_TTL_SECONDS = 30
+
+
+def case_lookup_key(case_id: int, user_id: Optional[int]) -> str:
+    return f"case:{user_id}:{case_id}"
+
+
+# Seconds a user's mock_data_enabled flag is reused before re-reading settings
+MOCK_FLAG_TTL_SECONDS = 300
+
+# Shorter reuse window for users without a settings row (cached as False)
+MOCK_FLAG_MISSING_TTL_SECONDS = 60
+
+
+def mock_flag_key(user_id: int) -> str:
+    return f"user_mock:{user_id}"
+
+
+def require_case_access(case_id: int, user=None) -> None:
+    """Raise Http404 unless the case exists (and belongs to ``user`` if given)
+
+    The check runs as an EXISTS query without loading the case row, and a
+    positive result is cached for a short TTL.
+    """
+    user_id = user.id if user is not None else None
+    key = case_lookup_key(case_id, user_id)
+    if cache.get(key):
+        return
+
+    cases = InvestigationCase.objects.filter(id=case_id)
+    if user_id is not None:
+        cases = cases.filter(investigator_id=user_id)
+    if not cases.exists():
+        raise Http404("No InvestigationCase matches the given query.")
+    cache.set(key, True, CASE_LOOKUP_TTL_SECONDS)
+
 
 class CacheService:
-    """SQLite-based caching service for portfolio data"""
+    """Portfolio and price cache persisted in SQLite
+
+    Reads are served from the Django cache (portfolio data) and a
+    process-local LRU (prices) before falling back to the database.
+    """
 
     @staticmethod
     def set_portfolio_data(
@@ -23,47 +121,156 @@ class CacheService:
             cache_key=key,
             defaults={"data": data, "expires_at": expires_at},
         )
+        cache.set(
+            _portfolio_cache_key(user_id, key),
+            data,
+            timeout=ttl_minutes * 60 if ttl_minutes else None,
+        )
 
     @staticmethod
     def get_portfolio_data(user_id: int, key: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached portfolio data"""
+        data = cache.get(_portfolio_cache_key(user_id, key))
+        if data is not None:
+            return data
+
         try:
-            cache = PortfolioCache.objects.get(user_id=user_id, cache_key=key)
+            entry = PortfolioCache.objects.only("data", "expires_at").get(
+                user_id=user_id, cache_key=key
+            )
 
             # Check if expired
-            if cache.expires_at and cache.expires_at < timezone.now():
-                cache.delete()
+            if entry.expires_at and entry.expires_at < timezone.now():
+                entry.delete()
                 return None
 
-            return cache.data  # type: ignore[return-value]
+            cache.set(
+                _portfolio_cache_key(user_id, key),
+                entry.data,
+                timeout=_remaining_seconds(entry.expires_at),
+            )
+            return entry.data  # type: ignore[return-value]
         except PortfolioCache.DoesNotExist:
             return None
 
+    @staticmethod
+    async def aget_cached_portfolio_data(
+        user_id: int, key: str
+    ) -> Optional[Dict[str, Any]]:
+        """Read portfolio data from the Django cache only, for async callers
+
+        Misses return None without touching the database. Django 4.2's
+        cache.aget() still runs on the thread-sensitive executor shared with
+        sync views, so the lookup goes to the default thread pool instead.
+        """
+        return await sync_to_async(cache.get, thread_sensitive=False)(
+            _portfolio_cache_key(user_id, key)
+        )
+
+    @staticmethod
+    def delete_portfolio_data(user_id: int, key: str) -> None:
+        """Invalidate cached portfolio data"""
+        PortfolioCache.objects.filter(user_id=user_id, cache_key=key).delete()
+        cache.delete(_portfolio_cache_key(user_id, key))
+
+    @staticmethod
+    def get_many_portfolio_data(
+        user_id: int, keys: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Retrieve several cached portfolio entries in one query
+
+        Missing and expired keys are omitted from the result.
+        """
+        keys = list(keys)
+        cached = cache.get_many([_portfolio_cache_key(user_id, key) for key in keys])
+        found = {}
+        missing = []
+        for key in keys:
+            data = cached.get(_portfolio_cache_key(user_id, key))
+            if data is None:
+                missing.append(key)
+            else:
+                found[key] = data
+        if not missing:
+            return found
+
+        now = timezone.now()
+        expired_keys = []
+        rows = PortfolioCache.objects.filter(
+            user_id=user_id, cache_key__in=missing
+        ).values_list("cache_key", "data", "expires_at")
+
+        for cache_key, data, expires_at in rows:
+            if expires_at and expires_at < now:
+                expired_keys.append(cache_key)
+            else:
+                found[cache_key] = data
+                cache.set(
+                    _portfolio_cache_key(user_id, cache_key),
+                    data,
+                    timeout=_remaining_seconds(expires_at),
+                )
+
+        if expired_keys:
+            PortfolioCache.objects.filter(
+                user_id=user_id, cache_key__in=expired_keys
+            ).delete()
+
+        return found
+
     @staticmethod
     def set_price_data(symbol: str, price_data: Dict[str, Any]) -> None:
         """Cache price data"""
         PriceCache.objects.update_or_create(
             symbol=symbol, defaults={"price_data": price_data}
         )
+        _price_memo.clear()
 
     @staticmethod
     def get_price_data(symbol: str) -> Optional[Dict[str, Any]]:
-        """Retrieve cached price data"""
-        try:
-            cache = PriceCache.objects.get(symbol=symbol)
+        """Retrieve cached price data if it is still fresh"""
+        return _price_slot(symbol, int(time.time()) // PRICE_TTL_SECONDS)
 
-            # Check if price data is fresh (30 seconds for crypto prices)
-            if cache.last_updated < timezone.now() - timedelta(seconds=30):
-                return None
+    @staticmethod
+    def set_many_price_data(prices: Dict[str, Dict[str, Any]]) -> None:
+        """Cache price data for several symbols with a single upsert"""
+        PriceCache.objects.bulk_create(
+            [
+                PriceCache(symbol=symbol, price_data=price_data)
+                for symbol, price_data in prices.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["symbol"],
+            update_fields=["price_data", "last_updated"],
+        )
+        _price_memo.clear()
 
-            return cache.price_data  # type: ignore[return-value]
-        except PriceCache.DoesNotExist:
-            return None
+    @staticmethod
+    def get_many_price_data(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve fresh cached prices for several symbols in one query"""
+        rows = PriceCache.objects.filter(
+            symbol__in=list(symbols),
+            last_updated__gte=timezone.now() - timedelta(seconds=PRICE_TTL_SECONDS),
+        ).values_list("symbol", "price_data")
+        return dict(rows)
 
     @staticmethod
     def cleanup_expired():
-        """Clean up expired cache entries"""
-        expired_count = PortfolioCache.objects.filter(
-            expires_at__lt=timezone.now()
-        ).delete()
-        return expired_count[0]
+        """Clean up expired cache entries
+
+        Issues a single DELETE instead of QuerySet.delete(), which would first
+        load every expired pk to collect cascades the cache table never has.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {PortfolioCache._meta.db_table} WHERE expires_at < %s",
+                [timezone.now()],
+            )
+            expired_count = cursor.rowcount
+
+            # Hand freed pages back after large sweeps (no-op unless the
+            # database uses auto_vacuum=INCREMENTAL)
+            if connection.vendor == "sqlite" and expired_count >= VACUUM_THRESHOLD:
+                cursor.execute("PRAGMA incremental_vacuum")
+
+        return expired_count
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+PATTERN_NAMES = {
+    "arbitrage": "Arbitrage Bot Strategy Tracker",
+    "defi": "DeFi Yield Farming Monitor",
+    "mev": "Cross-Chain MEV Analysis",
+}
+
+
+def backfill_pattern_slugs(apps, schema_editor):
+    InvestigationCase = apps.get_model("portfolio", "InvestigationCase")
+    for slug, name in PATTERN_NAMES.items():
+        InvestigationCase.objects.filter(name__icontains=name).update(
+            pattern_slug=slug
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0002_alter_casewallet_case_alter_casewallet_wallet"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="investigationcase",
+            name="pattern_slug",
+            field=models.CharField(blank=True, db_index=True, max_length=32),
+        ),
+        migrations.RunPython(backfill_pattern_slugs, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from transactions.models import Transaction
 from wallets.models import User, Wallet
 
 
@@ -11,6 +12,31 @@ class InvestigationStatus(models.TextChoices):
     ARCHIVED = "archived", "Archived"
 
 
+# Showcase cases reachable by pattern slug, mapped to their display names
+CASE_PATTERN_NAMES = {
+    "arbitrage": "Arbitrage Bot Strategy Tracker",
+    "defi": "DeFi Yield Farming Monitor",
+    "mev": "Cross-Chain MEV Analysis",
+}
+
+
+class InvestigationCaseQuerySet(models.QuerySet):
+    """Query helpers for investigation cases"""
+
+    def with_counts(self):
+        """Annotate wallet and transaction counts in the same query"""
+        return self.annotate(
+            _wallet_count=models.Count("wallets", distinct=True),
+            _transaction_count=models.Count("wallets__transactions", distinct=True),
+        )
+
+    def with_wallets(self):
+        """Prefetch case wallets together with their wallet rows"""
+        return self.prefetch_related(
+            models.Prefetch("case_wallets", queryset=CaseWallet.objects.for_list())
+        )
+
+
 class InvestigationCase(models.Model):
     """Investigation case for tracking multiple wallets and transactions"""
     
@@ -42,8 +68,11 @@ class InvestigationCase(models.Model):
         default="medium"
     )
     notes = models.TextField(blank=True)
+    pattern_slug = models.CharField(max_length=32, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = InvestigationCaseQuerySet.as_manager()
     
     class Meta:
         ordering = ["-updated_at"]
@@ -66,14 +95,10 @@ class InvestigationCase(models.Model):
     @property 
     def transaction_count(self):
         """Total transactions across all wallets in this case"""
-        # Use annotated value if available
+        # Use annotated value if available (see InvestigationCaseQuerySet.with_counts)
         if hasattr(self, '_transaction_count'):
             return self._transaction_count
-        from transactions.models import Transaction
-        wallet_ids = self.wallets.values_list('id', flat=True)
-        if wallet_ids:
-            return Transaction.objects.filter(wallet_id__in=wallet_ids).count()
-        return 0
+        return Transaction.objects.filter(wallet__case_wallets__case=self).count()
     
     @property
     def flagged_count(self):
@@ -95,6 +120,14 @@ class WalletCategory(models.TextChoices):
     EVIDENCE = "evidence", "Evidence"
 
 
+class CaseWalletQuerySet(models.QuerySet):
+    """Query helpers for case wallet memberships"""
+
+    def for_list(self):
+        """Join the case and wallet rows that __str__ and list views read"""
+        return self.select_related("case", "wallet")
+
+
 class CaseWallet(models.Model):
     """Through model for investigation case to wallet relationship with additional metadata"""
     
@@ -108,6 +141,8 @@ class CaseWallet(models.Model):
     notes = models.TextField(blank=True)
     flagged = models.BooleanField(default=False)
     added_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CaseWalletQuerySet.as_manager()
     
     class Meta:
         unique_together = ("case", "wallet")
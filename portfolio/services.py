@@ -1,13 +1,102 @@
 import random  # For mock data until we have real chain adapters
 from datetime import timedelta
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
 
+import httpx
+from django.core.cache import cache
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
 from django.utils import timezone
 
+from transactions.models import Transaction, TransactionType
 from wallets.models import UserSettings, Wallet
 
-from .cache import CacheService
+from .cache import (
+    MOCK_FLAG_MISSING_TTL_SECONDS,
+    MOCK_FLAG_TTL_SECONDS,
+    CacheService,
+    mock_flag_key,
+)
+
+
+# Mock (min balance, max balance, USD price) per chain for demo valuations;
+# chains without an entry are valued like Solana
+MOCK_WALLET_RANGES = {
+    "ethereum": (0.5, 10, 2000.0),
+    "bitcoin": (0.01, 0.5, 45000.0),
+    "solana": (10, 500, 100.0),
+}
+
+
+PRICE_API_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+# Shared client so price lookups reuse pooled connections instead of paying a
+# TCP/TLS handshake per call
+_PRICE_CLIENT = httpx.Client(
+    timeout=5,
+    headers={"accept": "application/json"},
+    # Pool limits go on the transport: the client ignores limits= when it is
+    # given one. Retry failed connects instead of failing the whole lookup
+    transport=httpx.HTTPTransport(
+        retries=2,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    ),
+)
+
+# Seconds a successful price lookup is reused
+PRICE_CACHE_SECONDS = 60
+
+# Span and number of points for each historical data period; unknown
+# periods fall back to 24h
+HISTORY_PERIODS = {
+    "24h": (timedelta(days=1), 24),
+    "7d": (timedelta(days=7), 7),
+    "30d": (timedelta(days=30), 30),
+}
+
+# Mock (symbol, min USD, max USD) holdings for the asset distribution chart
+MOCK_ASSET_RANGES = (
+    ("ETH", 2000, 10000),
+    ("BTC", 5000, 20000),
+    ("SOL", 1000, 5000),
+    ("USDC", 500, 2000),
+)
+
+# Mock USD prices for asset allocation; other assets are priced at $100
+MOCK_ASSET_PRICES = {"ETH": 2000.0, "BTC": 45000.0}
+
+# Transaction types that add to a wallet's balance; sells subtract from it
+BALANCE_CREDIT_TYPES = (TransactionType.BUY, TransactionType.TRANSFER)
+
+# Transaction amount signed by direction, so per-asset totals can be summed in
+# SQL (SQLite sums these as floats; only use it where floats are acceptable)
+SIGNED_AMOUNT = Case(
+    When(
+        transaction_type__in=BALANCE_CREDIT_TYPES,
+        then=F("amount"),
+    ),
+    When(transaction_type=TransactionType.SELL, then=-F("amount")),
+    default=Value(Decimal("0")),
+    output_field=DecimalField(max_digits=36, decimal_places=18),
+)
+
+
+def summary_cache_key(user_id: int) -> str:
+    return f"portfolio_summary_{user_id}"
+
+
+def invalidate_portfolio_summaries(user_ids: Iterable[int]) -> None:
+    """Drop cached summaries so open SSE streams push the new values
+
+    Writers that skip model signals (bulk_create, bulk_update) call this once
+    per batch with the users whose transactions they touched.
+    """
+    for user_id in set(user_ids):
+        CacheService.delete_portfolio_data(user_id, summary_cache_key(user_id))
+
+
+def asset_distribution_cache_key(user_id: int) -> str:
+    return f"asset_dist_{user_id}"
 
 
 class PortfolioService:
@@ -17,50 +106,58 @@ class PortfolioService:
         self.user = user
         self.cache_service = CacheService()
 
-        # Check if user has mock data enabled
-        try:
-            settings = UserSettings.objects.get(user=user)
-            self.mock_data_enabled = settings.mock_data_enabled
-        except UserSettings.DoesNotExist:
-            self.mock_data_enabled = False
+        # Check if user has mock data enabled (cached; see portfolio.signals)
+        cache_key = mock_flag_key(user.id)
+        mock_data_enabled = cache.get(cache_key)
+        if mock_data_enabled is None:
+            try:
+                settings = UserSettings.objects.only("mock_data_enabled").get(user=user)
+                mock_data_enabled = settings.mock_data_enabled
+                cache.set(cache_key, mock_data_enabled, MOCK_FLAG_TTL_SECONDS)
+            except UserSettings.DoesNotExist:
+                # Remember the miss too; creating settings clears the key
+                mock_data_enabled = False
+                cache.set(cache_key, False, MOCK_FLAG_MISSING_TTL_SECONDS)
+        self.mock_data_enabled = mock_data_enabled
 
     def get_portfolio_summary(self) -> Dict[str, Any]:
         """Calculate current portfolio value across all wallets"""
         # Check cache first
-        cache_key = f"portfolio_summary_{self.user.id}"
+        cache_key = summary_cache_key(self.user.id)
         cached_data = self.cache_service.get_portfolio_data(self.user.id, cache_key)
 
         if cached_data:
             return cached_data  # type: ignore[return-value]
 
-        # Calculate portfolio value
+        # Calculate portfolio value and wallet/chain counts in one query
         wallets = Wallet.objects.filter(user=self.user, is_active=True)
-        total_value = Decimal("0")
-
         if self.mock_data_enabled:
-            # Use mock values for demonstration
-            for wallet in wallets:
-                wallet_value = self._get_mock_wallet_value(wallet)
-                total_value += wallet_value
+            # Use mock values for demonstration; the chains drive both the
+            # values and the counts
+            chains = list(wallets.values_list("chain", flat=True))
+            total_value = sum(self._get_mock_wallet_values(chains))
+            wallet_count, chain_count = len(chains), len(set(chains))
         else:
             # Real data mode - would call chain adapters
             # For now, return zero since we don't have real adapters implemented
-            total_value = Decimal("0")
+            total_value = 0.0
+            counts = wallets.aggregate(
+                wallet_count=Count("id"), chain_count=Count("chain", distinct=True)
+            )
+            wallet_count, chain_count = counts["wallet_count"], counts["chain_count"]
 
         # Calculate 24h change
-        change_24h = (
-            self._calculate_24h_change() if self.mock_data_enabled else Decimal("0")
-        )
+        change_24h = self._calculate_24h_change() if self.mock_data_enabled else 0.0
 
         # Get asset distribution data
         asset_distribution = self._get_asset_distribution() if self.mock_data_enabled else {"labels": [], "values": []}
         
         result = {
-            "total_value_usd": float(total_value),
-            "change_24h": float(change_24h),
-            "wallet_count": wallets.count(),
+            "total_value_usd": total_value,
+            "change_24h": change_24h,
+            "wallet_count": wallet_count,
             "asset_count": len(asset_distribution["labels"]),
-            "chain_count": wallets.values("chain").distinct().count(),
+            "chain_count": chain_count,
             "top_performer": self._get_top_performer() if self.mock_data_enabled else {"symbol": "N/A", "change_24h": 0},
             "asset_labels": asset_distribution["labels"],
             "asset_values": asset_distribution["values"],
@@ -74,29 +171,20 @@ class PortfolioService:
 
         return result
 
-    def _get_mock_wallet_value(self, wallet: Wallet) -> Decimal:
-        """Generate mock wallet value for demo"""
-        # Different ranges based on chain
-        if wallet.chain == "ethereum":
-            # Mock ETH balance between 0.5 and 10 ETH
-            eth_balance = Decimal(str(random.uniform(0.5, 10)))
-            eth_price = Decimal("2000")  # Mock ETH price
-            return eth_balance * eth_price
-        elif wallet.chain == "bitcoin":
-            # Mock BTC balance between 0.01 and 0.5 BTC
-            btc_balance = Decimal(str(random.uniform(0.01, 0.5)))
-            btc_price = Decimal("45000")  # Mock BTC price
-            return btc_balance * btc_price
-        else:  # solana
-            # Mock SOL balance between 10 and 500 SOL
-            sol_balance = Decimal(str(random.uniform(10, 500)))
-            sol_price = Decimal("100")  # Mock SOL price
-            return sol_balance * sol_price
-
-    def _calculate_24h_change(self) -> Decimal:
+    def _get_mock_wallet_values(self, chains) -> List[float]:
+        """Generate mock USD values for wallets on the given chains in one pass"""
+        uniform = random.uniform
+        default_range = MOCK_WALLET_RANGES["solana"]
+        values = []
+        for chain in chains:
+            low, high, price = MOCK_WALLET_RANGES.get(chain, default_range)
+            values.append(uniform(low, high) * price)
+        return values
+
+    def _calculate_24h_change(self) -> float:
         """Calculate 24h portfolio change percentage"""
         # For MVP, return a mock change between -10% and +10%
-        return Decimal(str(random.uniform(-10, 10)))
+        return random.uniform(-10, 10)
 
     def get_historical_data(self, period: str = "24h") -> list:
         """Get historical portfolio values"""
@@ -104,47 +192,41 @@ class PortfolioService:
             # Return empty data in real mode
             return []
 
-        # Map period to timedelta
-        period_map = {
-            "24h": timedelta(days=1),
-            "7d": timedelta(days=7),
-            "30d": timedelta(days=30),
-        }
-
-        time_delta = period_map.get(period, timedelta(days=1))
+        time_delta, num_points = HISTORY_PERIODS.get(period, HISTORY_PERIODS["24h"])
         start_time = timezone.now() - time_delta
 
-        # Generate mock historical data
-        data_points = []
-        current_value = self.get_portfolio_summary()["total_value_usd"]
-
-        # Generate data points
-        num_points = 24 if period == "24h" else 7 if period == "7d" else 30
-        for i in range(num_points):
-            timestamp = start_time + (time_delta / num_points) * i
-            # Add some random variation
-            variation = random.uniform(0.95, 1.05)
-            value = Decimal(str(current_value)) * Decimal(str(variation))
+        # Generate mock historical data; the variation is plain float math
+        # on mock values, so skip the Decimal/str round-trips per point
+        current_value = float(self.get_portfolio_summary()["total_value_usd"])
+        step = time_delta / num_points
+        uniform = random.uniform
 
-            data_points.append(
-                {"timestamp": timestamp.isoformat(), "total_value_usd": float(value)}
-            )
-
-        return data_points
+        return [
+            {
+                "timestamp": (start_time + step * i).isoformat(),
+                "total_value_usd": current_value * uniform(0.95, 1.05),
+            }
+            for i in range(num_points)
+        ]
 
     def get_wallet_balances(self) -> list:
         """Get individual wallet balances"""
-        wallets = Wallet.objects.filter(user=self.user, is_active=True)
+        wallets = list(
+            Wallet.objects.filter(user=self.user, is_active=True).only(
+                "id", "address", "chain", "label"
+            )
+        )
+        if self.mock_data_enabled:
+            # Mock balances for demonstration
+            values = self._get_mock_wallet_values([wallet.chain for wallet in wallets])
+        else:
+            # Real data mode - would call chain adapters
+            values = [0.0] * len(wallets)
+        # Every balance in the batch shares one timestamp
+        last_updated = timezone.now().isoformat()
         balances = []
 
-        for wallet in wallets:
-            if self.mock_data_enabled:
-                # Mock balance for demonstration
-                value = self._get_mock_wallet_value(wallet)
-            else:
-                # Real data mode - would call chain adapters
-                value = Decimal("0")
-
+        for wallet, value in zip(wallets, values):
             balances.append(
                 {
                     "wallet_id": wallet.id,
@@ -152,8 +234,8 @@ class PortfolioService:
                     "chain": wallet.chain,
                     "label": wallet.label
                     or f"{wallet.address[:6]}...{wallet.address[-4:]}",
-                    "value_usd": float(value),
-                    "last_updated": timezone.now().isoformat(),
+                    "value_usd": value,
+                    "last_updated": last_updated,
                 }
             )
 
@@ -163,23 +245,30 @@ class PortfolioService:
         """Get asset distribution for portfolio chart"""
         if not self.mock_data_enabled:
             return {"labels": [], "values": []}
+
+        # The mock snapshot only needs to change about as often as the summary
+        cache_key = asset_distribution_cache_key(self.user.id)
+        cached_data = self.cache_service.get_portfolio_data(self.user.id, cache_key)
+        if cached_data:
+            return cached_data  # type: ignore[return-value]
         
-        # Mock asset distribution
-        assets = [
-            {"symbol": "ETH", "value": random.uniform(2000, 10000)},
-            {"symbol": "BTC", "value": random.uniform(5000, 20000)},
-            {"symbol": "SOL", "value": random.uniform(1000, 5000)},
-            {"symbol": "USDC", "value": random.uniform(500, 2000)},
-        ]
-        
-        # Filter out zero values and sort by value
-        assets = [a for a in assets if a["value"] > 0]
-        assets.sort(key=lambda x: x["value"], reverse=True)
+        # Mock asset distribution, sorted by value; every range is positive
+        uniform = random.uniform
+        assets = sorted(
+            ((uniform(low, high), symbol) for symbol, low, high in MOCK_ASSET_RANGES),
+            reverse=True,
+        )
         
-        labels = [a["symbol"] for a in assets]
-        values = [round(a["value"], 2) for a in assets]
+        labels = [symbol for _, symbol in assets]
+        values = [round(value, 2) for value, _ in assets]
+        result = {"labels": labels, "values": values}
+
+        # Cache for 1 minute, like the summary
+        self.cache_service.set_portfolio_data(
+            self.user.id, cache_key, result, ttl_minutes=1
+        )
         
-        return {"labels": labels, "values": values}
+        return result
     
     def _get_top_performer(self) -> Dict[str, Any]:
         """Get top performing asset in 24h"""
@@ -194,70 +283,79 @@ class PortfolioService:
         }
     
     def _calculate_wallet_balance(self, wallet, asset):
-        """Calculate wallet balance for a specific asset"""
-        from transactions.models import Transaction
-        from decimal import Decimal
-        
-        # Get all transactions for this wallet and asset
-        transactions = Transaction.objects.filter(
-            wallet=wallet,
-            asset_symbol=asset.symbol
-        )
-        
+        """Calculate wallet balance for a specific asset
+
+        Amounts are read in one query and summed as Decimals here: SQLite
+        aggregates DECIMAL columns as floats, which drops the 18-decimal
+        precision amounts are stored with.
+        """
         balance = Decimal('0')
-        for transaction in transactions:
-            # Use the actual TransactionType values
-            if transaction.transaction_type in ['buy', 'transfer']:
-                balance += transaction.amount
-            elif transaction.transaction_type in ['sell']:
-                balance -= transaction.amount
-        
+        for transaction_type, amount in self._wallet_balance_rows(wallet, asset):
+            if transaction_type in BALANCE_CREDIT_TYPES:
+                balance += amount
+            elif transaction_type == TransactionType.SELL:
+                balance -= amount
         return balance
+
+    def _wallet_balance_rows(self, wallet, asset):
+        """(transaction_type, amount) rows of one wallet's asset transactions
+
+        Ordering is cleared so the lookup is served by the wallet/asset/type
+        index without a sort.
+        """
+        return Transaction.objects.filter(
+            wallet=wallet,
+            asset_symbol=asset.symbol
+        ).order_by().values_list("transaction_type", "amount")
     
     def get_asset_allocation(self):
         """Get asset allocation across all wallets"""
-        from transactions.models import Transaction, Asset
-        from collections import defaultdict
-        
         if not self.mock_data_enabled:
             return []
         
-        # Get all user's wallets
-        wallets = Wallet.objects.filter(user=self.user, is_active=True)
-        
-        # Calculate balances per asset
-        asset_balances = defaultdict(Decimal)
-        for wallet in wallets:
-            transactions = Transaction.objects.filter(wallet=wallet)
-            for transaction in transactions:
-                if transaction.transaction_type in ['buy', 'transfer']:
-                    asset_balances[transaction.asset_symbol] += transaction.amount
-                elif transaction.transaction_type in ['sell']:
-                    asset_balances[transaction.asset_symbol] -= transaction.amount
+        # Sum balances per asset across the user's active wallets in one query
+        asset_balances = (
+            Transaction.objects.filter(wallet__user=self.user, wallet__is_active=True)
+            .values_list('asset_symbol')
+            .annotate(balance=Sum(SIGNED_AMOUNT))
+            .filter(balance__gt=0)  # Only include assets with positive balance
+            .order_by()
+        )
         
-        # Convert to list format with mock prices
+        # Convert to list format with mock prices; balances are converted to
+        # float once and valued in float
         allocation = []
-        for symbol, balance in asset_balances.items():
-            if balance > 0:  # Only include assets with positive balance
-                # Mock price for calculation
-                mock_price = Decimal('2000') if symbol == 'ETH' else Decimal('45000') if symbol == 'BTC' else Decimal('100')
-                value = balance * mock_price
-                allocation.append({
-                    'symbol': symbol,
-                    'balance': float(balance),
-                    'value_usd': float(value),
-                    'percentage': 0  # Will be calculated later if needed
-                })
+        for symbol, balance in asset_balances:
+            balance = float(balance)
+            allocation.append({
+                'symbol': symbol,
+                'balance': balance,
+                'value_usd': balance * MOCK_ASSET_PRICES.get(symbol, 100.0),
+            })
+        
+        # Share of the total value, computed in the same float pass
+        total_value = sum(item['value_usd'] for item in allocation)
+        scale = 100.0 / total_value if total_value else 0.0
+        for item in allocation:
+            item['percentage'] = item['value_usd'] * scale
         
         return allocation
     
     def _get_current_prices(self, symbols):
-        """Get current prices (with mock implementation for testing)"""
+        """Get current prices (with mock implementation for testing)
+
+        Successful lookups are shared through the Django cache for
+        PRICE_CACHE_SECONDS, so concurrent summaries reuse one API round trip.
+        """
+        cache_key = "prices:" + ",".join(sorted(symbols))
+        prices = cache.get(cache_key)
+        if prices is not None:
+            return prices
+
         try:
-            import requests
             # In a real implementation, this would call an external API
             # For now, simulate the API call for testing
-            response = requests.get("https://api.coingecko.com/api/v3/simple/price")
+            response = _PRICE_CLIENT.get(PRICE_API_URL)
             
             # Mock prices for testing
             mock_prices = {
@@ -267,10 +365,13 @@ class PortfolioService:
                 'USDC': 1.0
             }
             
-            return {symbol: mock_prices.get(symbol, 1.0) for symbol in symbols}
+            prices = {symbol: mock_prices.get(symbol, 1.0) for symbol in symbols}
         except Exception:
-            # Return empty dict on failure
+            # Return empty dict on failure (not cached, so the next call retries)
             return {}
+
+        cache.set(cache_key, prices, PRICE_CACHE_SECONDS)
+        return prices
     
     def _get_historical_prices(self, symbols):
         """Mock method for getting historical prices"""
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from transactions.models import Transaction
+from wallets.models import UserSettings, Wallet
+
+from .cache import case_lookup_key, mock_flag_key
+from .models import InvestigationCase
+from .services import invalidate_portfolio_summaries
+
+
+@receiver(post_delete, sender=InvestigationCase)
+def forget_deleted_case(sender, instance, **kwargs):
+    """Drop cached case lookups so deleted cases 404 immediately"""
+    cache.delete_many(
+        [
+            case_lookup_key(instance.id, instance.investigator_id),
+            case_lookup_key(instance.id, None),
+        ]
+    )
+
+
+@receiver([post_save, post_delete], sender=UserSettings)
+def forget_mock_flag(sender, instance, **kwargs):
+    """Drop the cached mock_data_enabled flag when settings change"""
+    cache.delete(mock_flag_key(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Wallet)
+def refresh_summary_for_wallet(sender, instance, **kwargs):
+    """Invalidate the portfolio summary so open SSE streams push new values"""
+    invalidate_portfolio_summaries([instance.user_id])
+
+
+class _SummaryInvalidation:
+    """Summaries to drop once the surrounding database transaction commits"""
+
+    def __init__(self):
+        self.user_ids = set()
+        self.wallet_ids = set()
+
+    def add(self, instance):
+        """Record the owner of a saved or deleted transaction"""
+        if Transaction.wallet.is_cached(instance):
+            self.user_ids.add(instance.wallet.user_id)
+        else:
+            # Resolved to users in one query when the batch runs
+            self.wallet_ids.add(instance.wallet_id)
+
+    def __call__(self):
+        user_ids = set(self.user_ids)
+        if self.wallet_ids:
+            user_ids.update(
+                Wallet.objects.filter(id__in=self.wallet_ids).values_list(
+                    "user_id", flat=True
+                )
+            )
+        invalidate_portfolio_summaries(user_ids)
+
+
+def _pending_summary_invalidation():
+    """Return the invalidation queued on the open transaction, queueing one"""
+    connection = transaction.get_connection()
+    # Callbacks of rolled back blocks are dropped from this list, so a batch
+    # found here is still going to run
+    for entry in connection.run_on_commit:
+        if isinstance(entry[1], _SummaryInvalidation):
+            return entry[1]
+    batch = _SummaryInvalidation()
+    transaction.on_commit(batch)
+    return batch
+
+
+@receiver([post_save, post_delete], sender=Transaction)
+def refresh_summary_for_transaction(sender, instance, **kwargs):
+    """Invalidate the owning user's portfolio summary
+
+    Inside an atomic block every write to the same user's transactions is
+    folded into one invalidation that runs after commit, so a loop of
+    create() calls costs one cache delete rather than one per row.
+    """
+    if transaction.get_connection().in_atomic_block:
+        _pending_summary_invalidation().add(instance)
+    else:
+        batch = _SummaryInvalidation()
+        batch.add(instance)
+        batch()
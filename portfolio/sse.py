@@ -1,50 +1,136 @@
-import json
+import asyncio
 import logging
 import time
 
+import orjson
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 
-from .services import PortfolioService
+from .cache import CacheService
+from .services import PortfolioService, summary_cache_key
 
 logger = logging.getLogger(__name__)
 
+# SSE frame delimiters, pre-encoded so frames are assembled as bytes only
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
+
+# Comment frame that keeps idle connections (and proxies) from timing out
+SSE_HEARTBEAT = b": keep-alive\n\n"
+HEARTBEAT_SECONDS = 15
+
+# Static portions of the portfolio-update frame; only the timestamp and the
+# two values are encoded per frame
+UPDATE_FRAME_PREFIX = SSE_PREFIX + b'{"type":"portfolio-update","timestamp":"'
+UPDATE_FRAME_VALUE = b'","total_value_usd":'
+UPDATE_FRAME_CHANGE = b',"change_24h":'
+UPDATE_FRAME_SUFFIX = b"}" + SSE_SUFFIX
+
+# Summary check interval (throttled to 10Hz max as per requirements) and the
+# longer back-off after a failed check
+POLL_SECONDS = 0.1
+ERROR_RETRY_SECONDS = 5
+
+
+class _SummaryFrames:
+    """Turn successive portfolio summaries into pre-encoded SSE frames"""
+
+    def __init__(self, user):
+        self.user = user
+        self.last_values = None
+        self.last_sent = time.monotonic()
+
+    def update(self, summary):
+        """Return the frame to send for a summary, or None to stay quiet"""
+        values = (summary["total_value_usd"], summary["change_24h"])
+        now = time.monotonic()
+
+        if values != self.last_values:
+            self.last_values = values
+            self.last_sent = now
+            return b"".join(
+                (
+                    UPDATE_FRAME_PREFIX,
+                    timezone.now().isoformat().encode(),
+                    UPDATE_FRAME_VALUE,
+                    orjson.dumps(values[0]),
+                    UPDATE_FRAME_CHANGE,
+                    orjson.dumps(values[1]),
+                    UPDATE_FRAME_SUFFIX,
+                )
+            )
+        if now - self.last_sent >= HEARTBEAT_SECONDS:
+            self.last_sent = now
+            return SSE_HEARTBEAT
+        return None
+
+    def error(self, exc):
+        """Log a failed check and return the error frame"""
+        logger.error(f"SSE Error for user {self.user.id}: {exc}")
+
+        # Resend the current values once the summary recovers
+        self.last_values = None
+
+        error_data = {
+            "type": "error",
+            "message": "Failed to fetch portfolio data",
+            "timestamp": timezone.now().isoformat(),
+        }
+        return SSE_PREFIX + orjson.dumps(error_data) + SSE_SUFFIX
+
 
 def portfolio_sse_stream(user):
     """Generate SSE events for portfolio updates
 
-    Yields portfolio data every 100ms (10Hz max as per requirements)
+    Checks the cached portfolio summary every 100ms (10Hz max as per
+    requirements) but only yields a frame when the values change; idle
+    streams get a keep-alive comment instead. Wallet and transaction writes
+    invalidate the cached summary (see portfolio.signals), so changes are
+    pushed on the next check. Frames are pre-encoded and ready to be written
+    to the response as-is.
+
+    This generator blocks its worker thread between checks; ASGI servers
+    should use async_portfolio_sse_stream instead.
     """
     portfolio_service = PortfolioService(user)
+    frames = _SummaryFrames(user)
 
     while True:
         try:
-            # Get current portfolio data
-            summary = portfolio_service.get_portfolio_summary()
+            frame = frames.update(portfolio_service.get_portfolio_summary())
+        except Exception as e:
+            yield frames.error(e)
+            time.sleep(ERROR_RETRY_SECONDS)
+            continue
 
-            # Format for SSE
-            data = {
-                "type": "portfolio-update",
-                "timestamp": timezone.now().isoformat(),
-                "total_value_usd": summary["total_value_usd"],
-                "change_24h": summary["change_24h"],
-            }
+        if frame is not None:
+            yield frame
+        time.sleep(POLL_SECONDS)
 
-            yield json.dumps(data)
 
-            # Wait before next update (throttled to 10Hz max as per requirements)
-            time.sleep(0.1)  # 100ms = 10Hz
+async def async_portfolio_sse_stream(user):
+    """Async variant of portfolio_sse_stream for ASGI servers
 
+    Sleeps on the event loop between checks, so idle subscribers do not pin
+    a worker thread. Each check reads the cached summary; only a miss hops
+    to the thread-sensitive executor to rebuild it through the ORM.
+    """
+    portfolio_service = await sync_to_async(PortfolioService)(user)
+    get_summary = sync_to_async(portfolio_service.get_portfolio_summary)
+    summary_key = summary_cache_key(user.id)
+    frames = _SummaryFrames(user)
+
+    while True:
+        try:
+            summary = await CacheService.aget_cached_portfolio_data(user.id, summary_key)
+            if summary is None:
+                summary = await get_summary()
+            frame = frames.update(summary)
         except Exception as e:
-            # Log error and continue
-            logger.error(f"SSE Error for user {user.id}: {e}")
-
-            # Send error event
-            error_data = {
-                "type": "error",
-                "message": "Failed to fetch portfolio data",
-                "timestamp": timezone.now().isoformat(),
-            }
-            yield json.dumps(error_data)
-
-            # Wait longer before retrying after error
-            time.sleep(5)
+            yield frames.error(e)
+            await asyncio.sleep(ERROR_RETRY_SECONDS)
+            continue
+
+        if frame is not None:
+            yield frame
+        await asyncio.sleep(POLL_SECONDS)
@@ -2,17 +2,38 @@
 Portfolio app tests - Services, calculations, and portfolio functionality.
 """
 
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.test import AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django_htmx.middleware import HtmxDetails
+from datetime import datetime, timezone as dt_timezone
 from decimal import Decimal
-from unittest.mock import patch, MagicMock
+from unittest import skipUnless
+from unittest.mock import Mock, patch
 import json
-
-from .services import PortfolioService
+import httpx
+
+from .api import portfolio_stream
+from .cache import (
+    PRICE_TTL_SECONDS,
+    CacheService,
+    _portfolio_cache_key,
+    _price_memo,
+    mock_flag_key,
+    require_case_access,
+)
+from .models import CaseWallet, InvestigationCase
+from .services import PortfolioService, summary_cache_key
+from .sse import async_portfolio_sse_stream
+from core.views import htmx_portfolio_summary
 from wallets.models import Wallet, UserSettings
 from wallets.models import Chain
-from transactions.models import Transaction, Asset, TransactionType
+from transactions.models import Transaction, Asset, TransactionType, PortfolioCache, PriceCache
+from tests.factories import build_transaction, make_address
 
 User = get_user_model()
 
@@ -20,22 +41,23 @@ User = get_user_model()
 class PortfolioServiceTestCase(TestCase):
     """Test PortfolioService functionality."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up fixtures shared by every test in the class."""
+        # No password: these tests never log in, so skip the hashing
+        cls.user = User.objects.create_user(
             email="test@example.com",
-            password="testpass123",
             username="testuser"
         )
         
-        self.wallet = Wallet.objects.create(
-            user=self.user,
+        cls.wallet = Wallet.objects.create(
+            user=cls.user,
             label="Test Wallet",
             chain=Chain.ETHEREUM,
             address="0x742d35Cc6631C0532925a3b8D86d6E4C6Ed3C07"
         )
         
-        self.asset, created = Asset.objects.get_or_create(
+        cls.asset, created = Asset.objects.get_or_create(
             symbol="ETH",
             chain=Chain.ETHEREUM,
             defaults={
@@ -43,7 +65,20 @@ class PortfolioServiceTestCase(TestCase):
                 "decimals": 18
             }
         )
-        
+
+    @classmethod
+    def setUpClass(cls):
+        """Patch price lookups once for the whole class."""
+        super().setUpClass()
+        patcher = patch.object(PortfolioService, "_get_current_prices")
+        cls.mock_prices = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def setUp(self):
+        """Set up per-test state."""
+        cache.clear()
+        self.mock_prices.reset_mock()
+        self.mock_prices.return_value = {"ETH": 2000.0, "BTC": 50000.0}
         self.service = PortfolioService(self.user)
 
     def test_portfolio_service_initialization(self):
@@ -51,11 +86,30 @@ class PortfolioServiceTestCase(TestCase):
         self.assertEqual(self.service.user, self.user)
         self.assertIsInstance(self.service, PortfolioService)
 
-    @patch('portfolio.services.PortfolioService._get_current_prices')
-    def test_get_portfolio_summary_empty(self, mock_prices):
+    def test_mock_flag_cached_until_settings_saved(self):
+        """Test the mock data flag is reused and refreshed on settings save."""
+        with self.assertNumQueries(0):
+            self.assertTrue(PortfolioService(self.user).mock_data_enabled)
+
+        settings = UserSettings.objects.get(user=self.user)
+        settings.mock_data_enabled = False
+        settings.save()
+
+        self.assertFalse(PortfolioService(self.user).mock_data_enabled)
+
+    def test_missing_settings_cached_until_created(self):
+        """Test a user without settings is not re-queried until settings exist."""
+        UserSettings.objects.filter(user=self.user).delete()
+        self.assertFalse(PortfolioService(self.user).mock_data_enabled)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(PortfolioService(self.user).mock_data_enabled)
+
+        UserSettings.objects.create(user=self.user, mock_data_enabled=True)
+        self.assertTrue(PortfolioService(self.user).mock_data_enabled)
+
+    def test_get_portfolio_summary_empty(self):
         """Test portfolio summary with no transactions."""
-        mock_prices.return_value = {"ETH": 2000.0}
-        
         # Disable mock data for this test
         from wallets.models import UserSettings
         from transactions.models import PortfolioCache
@@ -81,33 +135,14 @@ class PortfolioServiceTestCase(TestCase):
         self.assertIn('asset_labels', summary)
         self.assertEqual(summary['total_value_usd'], 0)
 
-    @patch('portfolio.services.PortfolioService._get_current_prices')
-    def test_get_portfolio_summary_with_transactions(self, mock_prices):
+    def test_get_portfolio_summary_with_transactions(self):
         """Test portfolio summary with transactions."""
-        mock_prices.return_value = {"ETH": 2000.0}
-        
         # Create some transactions
-        Transaction.objects.create(
-            wallet=self.wallet,
-            tx_hash="0x111",
-            block_number=12345,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("2.0"),
-            asset_symbol=self.asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        Transaction.objects.create(
-            wallet=self.wallet,
-            tx_hash="0x222",
-            block_number=12346,
-            transaction_type=TransactionType.SELL,
-            amount=Decimal("0.5"),
-            asset_symbol=self.asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            build_transaction(self.wallet, self.asset.symbol, 0, amount="2.0", timestamp=now),
+            build_transaction(self.wallet, self.asset.symbol, 1, TransactionType.SELL, "0.5", now),
+        ])
         
         summary = self.service.get_portfolio_summary()
         
@@ -116,6 +151,38 @@ class PortfolioServiceTestCase(TestCase):
         self.assertIn('asset_labels', summary)
         self.assertTrue(summary['total_value_usd'] > 0)
 
+        # Repeat summaries are served from the cache without touching the DB
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_portfolio_summary(), summary)
+
+    def test_portfolio_summary_queries_do_not_scale_with_wallets(self):
+        """Test summary query count stays flat as wallets are added."""
+        def count_summary_queries():
+            cache.clear()
+            PortfolioCache.objects.all().delete()
+            service = PortfolioService(self.user)
+            with CaptureQueriesContext(connection) as queries:
+                service.get_portfolio_summary()
+            return len(queries)
+
+        baseline = count_summary_queries()
+        wallets = Wallet.objects.bulk_create([
+            Wallet(
+                user=self.user,
+                label=f"Extra Wallet {index}",
+                chain=Chain.BITCOIN,
+                address=f"bc1q{index:038d}"
+            )
+            for index in range(3)
+        ])
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            build_transaction(wallet, "BTC", index, timestamp=now)
+            for index, wallet in enumerate(wallets)
+        ])
+
+        self.assertEqual(count_summary_queries(), baseline)
+
     def test_calculate_wallet_balance_no_transactions(self):
         """Test wallet balance calculation with no transactions."""
         balance = self.service._calculate_wallet_balance(self.wallet, self.asset)
@@ -124,43 +191,34 @@ class PortfolioServiceTestCase(TestCase):
     def test_calculate_wallet_balance_with_transactions(self):
         """Test wallet balance calculation with transactions."""
         # Add some transactions
-        Transaction.objects.create(
-            wallet=self.wallet,
-            tx_hash="0x111",
-            block_number=12345,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("5.0"),
-            asset_symbol=self.asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        Transaction.objects.create(
-            wallet=self.wallet,
-            tx_hash="0x222",
-            block_number=12346,
-            transaction_type=TransactionType.SELL,
-            amount=Decimal("2.0"),
-            asset_symbol=self.asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        Transaction.objects.create(
-            wallet=self.wallet,
-            tx_hash="0x333",
-            block_number=12347,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("1.5"),
-            asset_symbol=self.asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        balance = self.service._calculate_wallet_balance(self.wallet, self.asset)
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            build_transaction(self.wallet, self.asset.symbol, 0, amount="5.0", timestamp=now),
+            build_transaction(self.wallet, self.asset.symbol, 1, TransactionType.SELL, "2.0", now),
+            build_transaction(self.wallet, self.asset.symbol, 2, amount="1.5", timestamp=now),
+        ])
+        
+        # One query per wallet, however many transactions exist
+        with self.assertNumQueries(1):
+            balance = self.service._calculate_wallet_balance(self.wallet, self.asset)
         expected_balance = Decimal('5.0') - Decimal('2.0') + Decimal('1.5')
         self.assertEqual(balance, expected_balance)
 
+    def test_calculate_wallet_balance_keeps_full_precision(self):
+        """Test large and 18-decimal amounts are summed without float rounding."""
+        # SQLite keeps 15 significant digits per stored value, so each amount
+        # fits in that; only their exact sum needs the full 18 decimals
+        now = timezone.now()
+        symbol = self.asset.symbol
+        Transaction.objects.bulk_create([
+            build_transaction(self.wallet, symbol, 0, amount="1000000.12345678", timestamp=now),
+            build_transaction(self.wallet, symbol, 1, amount="0.000000000000000001", timestamp=now),
+            build_transaction(self.wallet, symbol, 2, TransactionType.SELL, "0.1", now),
+        ])
+
+        balance = self.service._calculate_wallet_balance(self.wallet, self.asset)
+        self.assertEqual(balance, Decimal("1000000.023456780000000001"))
+
     def test_get_portfolio_history_empty(self):
         """Test portfolio history with no data."""
         history = self.service.get_portfolio_history(days=7)
@@ -200,35 +258,9 @@ class PortfolioServiceTestCase(TestCase):
                 self.assertIn('timestamp', point)
                 self.assertIn('total_value_usd', point)
 
-    @patch('requests.get')
-    def test_get_current_prices_success(self, mock_get):
-        """Test successful price fetching."""
-        # Mock successful API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "ethereum": {"usd": 2000.0},
-            "bitcoin": {"usd": 50000.0}
-        }
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
-        
-        prices = self.service._get_current_prices(["ETH", "BTC"])
-        
-        self.assertIsInstance(prices, dict)
-        self.assertIn("ETH", prices)
-        self.assertEqual(prices["ETH"], 2000.0)
-
-    @patch('requests.get')
-    def test_get_current_prices_failure(self, mock_get):
-        """Test price fetching failure handling."""
-        # Mock API failure
-        mock_get.side_effect = Exception("API Error")
-        
-        prices = self.service._get_current_prices(["ETH"])
-        
-        self.assertIsInstance(prices, dict)
-        # Should return default prices on failure
-        self.assertEqual(len(prices), 0)
+        # History reuses the cached summary, so later periods are query-free
+        with self.assertNumQueries(0):
+            self.service.get_portfolio_history(days=30)
 
     def test_get_asset_allocation(self):
         """Test asset allocation calculation."""
@@ -261,29 +293,15 @@ class PortfolioServiceTestCase(TestCase):
         )
         
         # Add transactions
-        Transaction.objects.create(
-            wallet=self.wallet,
-            tx_hash="0x111",
-            block_number=12345,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("2.0"),
-            asset_symbol=self.asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            build_transaction(self.wallet, self.asset.symbol, 0, amount="2.0", timestamp=now),
+            build_transaction(btc_wallet, btc_asset.symbol, 1, amount="0.1", timestamp=now),
+        ])
         
-        Transaction.objects.create(
-            wallet=btc_wallet,
-            tx_hash="0x222",
-            block_number=12346,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("0.1"),
-            asset_symbol=btc_asset.symbol,
-            gas_fee=Decimal("0.0001"),
-            timestamp=timezone.now()
-        )
-        
-        allocation = service.get_asset_allocation()
+        # Balances for every asset come from one grouped aggregate
+        with self.assertNumQueries(1):
+            allocation = service.get_asset_allocation()
         
         self.assertIsInstance(allocation, list)
         # Should have allocations for assets with non-zero balances
@@ -295,21 +313,72 @@ class PortfolioServiceTestCase(TestCase):
             self.assertTrue(len(symbols) > 0)
 
 
+class PriceLookupTestCase(SimpleTestCase):
+    """Test PortfolioService price lookups against a mocked API client."""
+
+    def setUp(self):
+        """Set up per-test state without touching the database."""
+        cache.clear()
+        # Unsaved user with its mock data flag cached, so no query is needed
+        self.user = User(id=1, email="test@example.com", username="testuser")
+        cache.set(mock_flag_key(self.user.id), False)
+        self.service = PortfolioService(self.user)
+
+    @patch('portfolio.services._PRICE_CLIENT.get')
+    def test_get_current_prices_success(self, mock_get):
+        """Test successful price fetching."""
+        # Mock successful API response
+        mock_response = Mock(spec=httpx.Response)
+        mock_response.json.return_value = {
+            "ethereum": {"usd": 2000.0},
+            "bitcoin": {"usd": 50000.0}
+        }
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+        
+        prices = self.service._get_current_prices(["ETH", "BTC"])
+        
+        self.assertIsInstance(prices, dict)
+        self.assertIn("ETH", prices)
+        self.assertEqual(prices["ETH"], 2000.0)
+
+        # A repeat lookup is served from the cache
+        self.assertEqual(self.service._get_current_prices(["BTC", "ETH"]), prices)
+        mock_get.assert_called_once()
+
+    @patch('portfolio.services._PRICE_CLIENT.get')
+    def test_get_current_prices_failure(self, mock_get):
+        """Test price fetching failure handling."""
+        # Mock API failure
+        mock_get.side_effect = Exception("API Error")
+        
+        prices = self.service._get_current_prices(["ETH"])
+        
+        self.assertIsInstance(prices, dict)
+        # Should return default prices on failure
+        self.assertEqual(len(prices), 0)
+
+
 class PortfolioViewsTestCase(TestCase):
     """Test portfolio-related views."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.user = User.objects.create_user(
             email="test@example.com",
-            password="testpass123",
             username="testuser"
         )
-        self.client.login(email="test@example.com", password="testpass123")
 
+    def setUp(self):
+        """Set up per-test state."""
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    @patch('core.views.render', return_value=HttpResponse())
     @patch('portfolio.services.PortfolioService.get_portfolio_summary')
-    def test_portfolio_summary_view(self, mock_summary):
+    def test_portfolio_summary_view(self, mock_summary, mock_render):
         """Test portfolio summary view."""
         mock_summary.return_value = {
             'total_value': 5000.0,
@@ -318,12 +387,38 @@ class PortfolioViewsTestCase(TestCase):
             'assets': []
         }
         
-        response = self.client.get("/htmx/portfolio/summary/", HTTP_HX_REQUEST="true")
+        # Session, user and the mock data flag; the summary itself is mocked
+        # and rendering is patched out so only the view's own queries count
+        with self.assertNumQueries(3):
+            response = self.client.get("/htmx/portfolio/summary/", HTTP_HX_REQUEST="true")
         self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, "partials/portfolio_summary.html")
+        mock_render.assert_called_once_with(
+            response.wsgi_request,
+            "partials/portfolio_summary.html",
+            {"summary": mock_summary.return_value},
+        )
+
+    def test_portfolio_summary_requires_authentication(self):
+        """Test that portfolio summary requires authentication."""
+        self.client.logout()
+        response = self.client.get("/htmx/portfolio/summary/")
+        self.assertEqual(response.status_code, 302)  # Redirect to login
+
 
+class PortfolioViewMockedTestCase(SimpleTestCase):
+    """Test portfolio views with the summary mocked, without a database."""
+
+    def setUp(self):
+        """Set up per-test state."""
+        cache.clear()
+        self.factory = RequestFactory()
+        # Unsaved user with its mock data flag cached, so no query is needed
+        self.user = User(id=1, email="test@example.com", username="testuser")
+        cache.set(mock_flag_key(self.user.id), False)
+
+    @patch('core.views.render', return_value=HttpResponse())
     @patch('portfolio.services.PortfolioService.get_portfolio_summary')
-    def test_portfolio_summary_htmx_request(self, mock_summary):
+    def test_portfolio_summary_htmx_request(self, mock_summary, mock_render):
         """Test portfolio summary with HTMX request."""
         mock_summary.return_value = {
             'total_value': 5000.0,
@@ -331,30 +426,64 @@ class PortfolioViewsTestCase(TestCase):
             'total_change_percent_24h': 3.0,
             'assets': []
         }
-        
-        response = self.client.get("/htmx/portfolio/summary/", 
-                                 HTTP_HX_REQUEST="true")
+
+        request = self.factory.get("/htmx/portfolio/summary/", HTTP_HX_REQUEST="true")
+        request.user = self.user
+        request.htmx = HtmxDetails(request)
+
+        # SimpleTestCase rejects any query, so this also pins the view to none
+        response = htmx_portfolio_summary(request)
         self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, "partials/portfolio_summary.html")
+        mock_render.assert_called_once_with(
+            request, "partials/portfolio_summary.html", {"summary": mock_summary.return_value}
+        )
 
-    def test_portfolio_summary_requires_authentication(self):
-        """Test that portfolio summary requires authentication."""
-        self.client.logout()
-        response = self.client.get("/htmx/portfolio/summary/")
-        self.assertEqual(response.status_code, 302)  # Redirect to login
+    def test_portfolio_stream_is_async_under_asgi(self):
+        """Test ASGI requests stream from the async generator, not a thread."""
+        request = AsyncRequestFactory().get("/api/v1/portfolio/stream")
+        request.user = self.user
+
+        response = portfolio_stream(request)
+        # A sync iterator would be drained with sync_to_async(list) and hold
+        # the thread-sensitive executor for as long as the stream is open
+        self.assertTrue(response.is_async)
+
+    def test_portfolio_stream_is_sync_under_wsgi(self):
+        """Test WSGI requests keep the blocking generator."""
+        request = self.factory.get("/api/v1/portfolio/stream")
+        request.user = self.user
+
+        self.assertFalse(portfolio_stream(request).is_async)
+
+    @patch('portfolio.services.PortfolioService.get_portfolio_summary')
+    async def test_async_stream_reads_cached_summary(self, mock_summary):
+        """Test the async stream polls the cache without the sync summary path."""
+        summary = {"total_value_usd": 1234.5, "change_24h": 1.5}
+        key = _portfolio_cache_key(self.user.id, summary_cache_key(self.user.id))
+        await cache.aset(key, summary)
+
+        stream = async_portfolio_sse_stream(self.user)
+        frame = await anext(stream)
+        await stream.aclose()
+
+        self.assertIn(b'"total_value_usd":1234.5', frame)
+        mock_summary.assert_not_called()
 
 
 class PortfolioCalculationTestCase(TestCase):
     """Test portfolio calculation accuracy and edge cases."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.user = User.objects.create_user(
             email="test@example.com",
-            password="testpass123",
             username="testuser"
         )
-        
+
+    def setUp(self):
+        """Set up per-test state."""
+        cache.clear()
         self.service = PortfolioService(self.user)
 
     def test_empty_portfolio_calculations(self):
@@ -382,43 +511,8 @@ class PortfolioCalculationTestCase(TestCase):
         self.assertEqual(summary['asset_count'], 0)
         self.assertEqual(len(summary['asset_labels']), 0)
 
-    def test_precision_in_calculations(self):
-        """Test that calculations maintain proper precision."""
-        wallet = Wallet.objects.create(
-            user=self.user,
-            label="Test Wallet",
-            chain=Chain.ETHEREUM,
-            address="0x742d35Cc6631C0532925a3b8D86d6E4C6Ed3C07"
-        )
-        
-        asset, created = Asset.objects.get_or_create(
-            symbol="ETH",
-            chain=Chain.ETHEREUM,
-            defaults={
-                "name": "Ethereum",
-                "decimals": 18
-            }
-        )
-        
-        # Create transaction with very precise amount
-        precise_amount = Decimal("1.123456789012345678")
-        Transaction.objects.create(
-            wallet=wallet,
-            tx_hash="0x111",
-            block_number=12345,
-            transaction_type=TransactionType.BUY,
-            amount=precise_amount,
-            asset_symbol=asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        balance = self.service._calculate_wallet_balance(wallet, asset)
-        # Check precision to 12 decimal places (practical precision limit)
-        self.assertAlmostEqual(float(balance), float(precise_amount), places=12)
-
-    def test_multiple_wallets_same_asset(self):
-        """Test calculations across multiple wallets with same asset."""
+    def test_wallet_balance_scenarios(self):
+        """Test balance precision, negative balances and per-wallet isolation."""
         asset, created = Asset.objects.get_or_create(
             symbol="ETH",
             chain=Chain.ETHEREUM,
@@ -427,109 +521,245 @@ class PortfolioCalculationTestCase(TestCase):
                 "decimals": 18
             }
         )
-        
-        # Create two wallets
-        wallet1 = Wallet.objects.create(
-            user=self.user,
-            label="Wallet 1",
-            chain=Chain.ETHEREUM,
-            address="0x1111111111111111111111111111111111111111"
-        )
-        
-        wallet2 = Wallet.objects.create(
-            user=self.user,
-            label="Wallet 2",
-            chain=Chain.ETHEREUM,
-            address="0x2222222222222222222222222222222222222222"
-        )
-        
-        # Add transactions to both wallets
-        Transaction.objects.create(
-            wallet=wallet1,
-            tx_hash="0x111",
-            block_number=12345,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("1.5"),
-            asset_symbol=asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        Transaction.objects.create(
-            wallet=wallet2,
-            tx_hash="0x222",
-            block_number=12346,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("2.5"),
-            asset_symbol=asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
-        )
-        
-        # Check individual balances
-        balance1 = self.service._calculate_wallet_balance(wallet1, asset)
-        balance2 = self.service._calculate_wallet_balance(wallet2, asset)
-        
-        self.assertEqual(balance1, Decimal("1.5"))
-        self.assertEqual(balance2, Decimal("2.5"))
-
-    def test_negative_balance_handling(self):
-        """Test handling of negative balances (more sends than receives)."""
+        wallets = Wallet.objects.bulk_create([
+            Wallet(
+                user=self.user,
+                label="Wallet 1",
+                chain=Chain.ETHEREUM,
+                address="0x1111111111111111111111111111111111111111"
+            ),
+            Wallet(
+                user=self.user,
+                label="Wallet 2",
+                chain=Chain.ETHEREUM,
+                address="0x2222222222222222222222222222222222222222"
+            ),
+        ])
+
+        # (name, [(wallet index, type, amount)], expected balance per wallet,
+        #  decimal places to compare to, or None for an exact match)
+        scenarios = [
+            (
+                "precision",
+                [(0, TransactionType.BUY, Decimal("1.123456789012345678"))],
+                [Decimal("1.123456789012345678"), Decimal("0")],
+                # SQLite stores 15 significant digits (practical precision limit)
+                12,
+            ),
+            (
+                "multiple wallets same asset",
+                [
+                    (0, TransactionType.BUY, Decimal("1.5")),
+                    (1, TransactionType.BUY, Decimal("2.5")),
+                ],
+                [Decimal("1.5"), Decimal("2.5")],
+                None,
+            ),
+            (
+                "negative balance",
+                [
+                    (0, TransactionType.BUY, Decimal("1.0")),
+                    (0, TransactionType.SELL, Decimal("1.5")),
+                ],
+                [Decimal("-0.5"), Decimal("0")],
+                None,
+            ),
+        ]
+
+        now = timezone.now()
+        for name, tx_specs, expected, places in scenarios:
+            with self.subTest(case=name):
+                Transaction.objects.bulk_create([
+                    build_transaction(
+                        wallets[wallet_index], asset.symbol, i, transaction_type, amount, now
+                    )
+                    for i, (wallet_index, transaction_type, amount) in enumerate(tx_specs)
+                ])
+                try:
+                    for wallet, expected_balance in zip(wallets, expected):
+                        # One query per wallet
+                        with self.assertNumQueries(1):
+                            balance = self.service._calculate_wallet_balance(wallet, asset)
+                        if places is None:
+                            self.assertEqual(balance, expected_balance)
+                        else:
+                            self.assertAlmostEqual(balance, expected_balance, places=places)
+                finally:
+                    # Hashes restart at 0 per scenario, so never leave rows behind
+                    Transaction.objects.all().delete()
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN output is backend specific")
+    def test_wallet_balance_uses_composite_index(self):
+        """Test the balance lookup is served by the wallet/asset/type index."""
         wallet = Wallet.objects.create(
             user=self.user,
             label="Test Wallet",
             chain=Chain.ETHEREUM,
             address="0x742d35Cc6631C0532925a3b8D86d6E4C6Ed3C07"
         )
-        
-        asset, created = Asset.objects.get_or_create(
-            symbol="ETH",
-            chain=Chain.ETHEREUM,
-            defaults={
-                "name": "Ethereum",
-                "decimals": 18
-            }
+
+        # The exact queryset _calculate_wallet_balance reads
+        asset = Asset(symbol="ETH", chain=Chain.ETHEREUM)
+        plan = self.service._wallet_balance_rows(wallet, asset).explain()
+
+        self.assertIn("tx_wallet_asset_type_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_case_counts_annotated(self):
+        """Test wallet and transaction counts come from one annotated query."""
+        case = InvestigationCase.objects.create(name="Test Case", investigator=self.user)
+        wallets = Wallet.objects.bulk_create([
+            Wallet(
+                user=self.user,
+                label=f"Wallet {index}",
+                chain=Chain.ETHEREUM,
+                address=make_address(index)
+            )
+            for index in range(2)
+        ])
+        CaseWallet.objects.bulk_create([CaseWallet(case=case, wallet=wallet) for wallet in wallets])
+        now = timezone.now()
+        Transaction.objects.bulk_create([
+            build_transaction(wallet, "ETH", index, timestamp=now)
+            for index, wallet in enumerate(wallets)
+        ])
+
+        with self.assertNumQueries(1):
+            case = InvestigationCase.objects.with_counts().get(pk=case.pk)
+            self.assertEqual(case.wallet_count, 2)
+            self.assertEqual(case.transaction_count, 2)
+
+
+class CacheServiceTestCase(TestCase):
+    """Test bulk cache reads and writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.user = User.objects.create_user(
+            email="test@example.com",
+            username="testuser"
         )
-        
-        # Create transactions resulting in negative balance
-        Transaction.objects.create(
-            wallet=wallet,
-            tx_hash="0x111",
-            block_number=12345,
-            transaction_type=TransactionType.BUY,
-            amount=Decimal("1.0"),
-            asset_symbol=asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
+
+    def setUp(self):
+        """Set up per-test state."""
+        cache.clear()
+
+    def test_get_many_portfolio_data_skips_expired(self):
+        """Test bulk portfolio lookup returns only live entries."""
+        CacheService.set_portfolio_data(self.user.id, "summary", {"total": 1})
+        CacheService.set_portfolio_data(self.user.id, "history", {"points": []})
+        PortfolioCache.objects.filter(cache_key="history").update(
+            expires_at=timezone.now() - timezone.timedelta(minutes=1)
         )
-        
-        Transaction.objects.create(
-            wallet=wallet,
-            tx_hash="0x222",
-            block_number=12346,
-            transaction_type=TransactionType.SELL,
-            amount=Decimal("1.5"),
-            asset_symbol=asset.symbol,
-            gas_fee=Decimal("0.001"),
-            timestamp=timezone.now()
+        # Drop the in-memory copies so the lookup has to read SQLite
+        cache.clear()
+
+        with self.assertNumQueries(2):
+            data = CacheService.get_many_portfolio_data(
+                self.user.id, ["summary", "history", "missing"]
+            )
+
+        self.assertEqual(data, {"summary": {"total": 1}})
+        self.assertFalse(PortfolioCache.objects.filter(cache_key="history").exists())
+
+    def test_set_many_price_data_upserts(self):
+        """Test bulk price writes insert new symbols and update existing ones."""
+        CacheService.set_price_data("ETH", {"usd": 2000})
+
+        CacheService.set_many_price_data({"ETH": {"usd": 2500}, "BTC": {"usd": 40000}})
+
+        self.assertEqual(
+            CacheService.get_many_price_data(["ETH", "BTC", "SOL"]),
+            {"ETH": {"usd": 2500}, "BTC": {"usd": 40000}},
         )
-        
-        balance = self.service._calculate_wallet_balance(wallet, asset)
-        self.assertEqual(balance, Decimal("-0.5"))
+
+    @patch("portfolio.cache.time.time")
+    def test_price_miss_is_not_memoized(self, mock_time):
+        """Test a price written by another worker after a miss is served."""
+        mock_time.return_value = timezone.now().timestamp()
+        _price_memo.clear()
+        self.assertIsNone(CacheService.get_price_data("ETH"))
+
+        # Written directly, as another process would, so this memo is untouched
+        PriceCache.objects.create(symbol="ETH", price_data={"usd": 2000})
+
+        self.assertEqual(CacheService.get_price_data("ETH"), {"usd": 2000})
+
+    @patch("portfolio.cache.time.time")
+    def test_price_written_before_slot_is_stale(self, mock_time):
+        """Test freshness is measured from the slot start, not the lookup time."""
+        now = timezone.now().timestamp()
+        mock_time.return_value = now
+        slot_start = datetime.fromtimestamp(
+            now // PRICE_TTL_SECONDS * PRICE_TTL_SECONDS, tz=dt_timezone.utc
+        )
+        PriceCache.objects.create(symbol="ETH", price_data={"usd": 2000})
+
+        for last_updated, expected in [
+            (slot_start - timezone.timedelta(seconds=1), None),
+            (slot_start, {"usd": 2000}),
+        ]:
+            PriceCache.objects.filter(symbol="ETH").update(last_updated=last_updated)
+            _price_memo.clear()
+            self.assertEqual(CacheService.get_price_data("ETH"), expected)
+
+    def test_case_access_cached_until_deleted(self):
+        """Test case access checks are reused and dropped on delete."""
+        case = InvestigationCase.objects.create(name="Case", investigator=self.user)
+        require_case_access(case.id, self.user)
+
+        with self.assertNumQueries(0):
+            require_case_access(case.id, self.user)
+
+        case.delete()
+        with self.assertRaises(Http404):
+            require_case_access(case.id, self.user)
+
+    def test_get_portfolio_data_served_from_cache(self):
+        """Test repeated portfolio reads skip the database."""
+        CacheService.set_portfolio_data(self.user.id, "summary", {"total": 1})
+
+        with self.assertNumQueries(0):
+            data = CacheService.get_portfolio_data(self.user.id, "summary")
+
+        self.assertEqual(data, {"total": 1})
+
+    def test_transaction_writes_invalidate_summary_once_on_commit(self):
+        """Test a block of transaction writes drops the summary once, after commit."""
+        wallet = Wallet.objects.create(
+            user=self.user, label="Wallet", chain=Chain.ETHEREUM, address=make_address(0)
+        )
+        key = summary_cache_key(self.user.id)
+        CacheService.set_portfolio_data(self.user.id, key, {"total": 1})
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for index in range(3):
+                build_transaction(wallet, "ETH", index).save()
+            # Reloaded rows have no cached wallet, so the owner is looked up
+            Transaction.objects.get(tx_hash=build_transaction(wallet, "ETH", 0).tx_hash).delete()
+            # Nothing is dropped until the block commits
+            self.assertEqual(CacheService.get_portfolio_data(self.user.id, key), {"total": 1})
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(CacheService.get_portfolio_data(self.user.id, key))
 
 
 class PortfolioIntegrationTestCase(TestCase):
     """Integration tests for portfolio functionality."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.user = User.objects.create_user(
             email="test@example.com",
-            password="testpass123",
             username="testuser"
         )
-        self.client.login(email="test@example.com", password="testpass123")
+
+    def setUp(self):
+        """Set up per-test state."""
+        self.client = Client()
+        self.client.force_login(self.user)
 
     def test_full_portfolio_flow(self):
         """Test complete portfolio workflow."""
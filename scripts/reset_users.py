@@ -3,20 +3,47 @@
 
 import os
 import sys
+
 import django
+from django.conf import settings
+
+from config import settings as project_settings
 
-# Setup Django
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Setup Django. The PostgreSQL TRUNCATE below only needs the user model, so
+# load just the auth and wallets apps; the ORM delete() fallback (and --full)
+# needs every app so the cascade can find all related rows.
+engine = project_settings.DATABASES["default"]["ENGINE"]
+if "--full" not in sys.argv[1:] and engine.endswith("postgresql"):
+    settings.configure(
+        DATABASES=project_settings.DATABASES,
+        INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes", "wallets"],
+        AUTH_USER_MODEL=project_settings.AUTH_USER_MODEL,
+        DEFAULT_AUTO_FIELD=project_settings.DEFAULT_AUTO_FIELD,
+    )
+else:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django.setup()
 
-from wallets.models import User
+from django.db import connection  # noqa: E402
+
+from wallets.models import User  # noqa: E402
 
 # Delete all existing users
 print("Deleting all existing users...")
-User.objects.all().delete()
-print("All users deleted!")
+if connection.vendor == "postgresql":
+    # Every relation to users cascades, so one TRUNCATE ... CASCADE clears
+    # the same rows as delete() without collecting and deleting them one by one
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"TRUNCATE TABLE {connection.ops.quote_name(User._meta.db_table)} "
+            "RESTART IDENTITY CASCADE"
+        )
+else:
+    User.objects.all().delete()
 
 # Create new superuser
-print("\nNow run one of these commands to create a new superuser:")
-print("1. python manage.py createsuperuser")
-print("2. python manage.py generate_mock_data --superusers 1 --users 2")
+print("""All users deleted!
+
+Now run one of these commands to create a new superuser:
+1. python manage.py createsuperuser
+2. python manage.py generate_mock_data --superusers 1 --users 2""")
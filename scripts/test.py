@@ -30,28 +30,21 @@ def run_tests():
         print("  --views        Run only view tests")
         print("  --models       Run only model tests")
         print("  --coverage     Run with coverage report")
-        print("  --parallel     Run tests in parallel")
+        print("  --parallel [N] Run tests in N processes (default N: one per core)")
+        print("  --no-parallel  Run tests in a single process (the default)")
         print("  --failfast     Stop on first failure")
         print("  <app>          Run tests for specific app")
         print("  <test_path>    Run specific test")
         return
     
-    # Build command
+    # Build command. The test database is in-memory SQLite, so there is no
+    # schema to keep between runs and --keepdb would be a no-op
     cmd = [sys.executable, 'manage.py', 'test']
     
     # Handle special flags
-    if '--coverage' in args:
+    coverage = '--coverage' in args
+    if coverage:
         args.remove('--coverage')
-        # Run with coverage
-        coverage_cmd = [sys.executable, '-m', 'coverage', 'run', '--source=.', 'manage.py', 'test']
-        coverage_cmd.extend(args)
-        result = subprocess.run(coverage_cmd)
-        if result.returncode == 0:
-            # Show coverage report
-            subprocess.run([sys.executable, '-m', 'coverage', 'report'])
-            subprocess.run([sys.executable, '-m', 'coverage', 'html'])
-            print("\nCoverage report generated in htmlcov/")
-        return
     
     # Handle test markers
     if '--unit' in args:
@@ -67,10 +60,20 @@ def run_tests():
         args.remove('--models')
         cmd.extend(['--tag', 'models'])
     
-    # Handle parallel
-    if '--parallel' in args:
-        args.remove('--parallel')
-        cmd.extend(['--parallel', 'auto'])
+    # Handle parallel: opt-in, one test database per worker. Failing tests
+    # must have picklable tracebacks (tblib) or a worker crash hides results.
+    parallel = False
+    if '--no-parallel' in args:
+        args.remove('--no-parallel')
+    elif '--parallel' in args:
+        index = args.index('--parallel')
+        args.pop(index)
+        workers = 'auto'
+        if index < len(args) and args[index].isdigit():
+            workers = args.pop(index)
+        if workers != '1':
+            parallel = True
+            cmd.extend(['--parallel', workers])
     
     # Handle failfast
     if '--failfast' in args:
@@ -84,6 +87,24 @@ def run_tests():
     if not any('-v' in arg for arg in args):
         cmd.extend(['-v', '2'])
     
+    if coverage:
+        # Source and multiprocessing support come from [tool.coverage.run]
+        coverage_cmd = [sys.executable, '-m', 'coverage', 'run']
+        if parallel:
+            # Each test worker writes its own data file; merged below
+            coverage_cmd.append('--parallel-mode')
+        coverage_cmd.extend(cmd[1:])
+        result = subprocess.run(coverage_cmd)
+        if result.returncode == 0:
+            # Multiprocessing support writes one data file per process, even
+            # for serial runs, so always merge before reporting
+            subprocess.run([sys.executable, '-m', 'coverage', 'combine'])
+            # Show coverage report
+            subprocess.run([sys.executable, '-m', 'coverage', 'report'])
+            subprocess.run([sys.executable, '-m', 'coverage', 'html'])
+            print("\nCoverage report generated in htmlcov/")
+        return
+    
     # Run tests
     subprocess.run(cmd)
 
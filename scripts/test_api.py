@@ -4,155 +4,192 @@ Quick API test script to verify all endpoints are working
 Run with: python test_api.py
 """
 
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 BASE_URL = "http://localhost:8000/api"
 
+# One session per thread: requests.Session is not thread-safe, but each
+# thread's calls still reuse its own keep-alive connection
+_local = threading.local()
+
+
+def get_session():
+    """Return this thread's session, creating it on first use"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"User-Agent": "portfolio-smoke-test"})
+        _local.session = session
+    return session
+
 # Test credentials
 TEST_EMAIL = "user0@example.com"
 TEST_PASSWORD = "testpass123"
 
 
-def test_auth():
+def test_auth(out=sys.stdout):
     """Test authentication endpoints"""
-    print("\n=== Testing Authentication ===")
+    print("\n=== Testing Authentication ===", file=out)
 
     # Login
-    response = requests.post(
+    response = get_session().post(
         f"{BASE_URL}/auth/login/", json={"email": TEST_EMAIL, "password": TEST_PASSWORD}
     )
 
     if response.status_code == 200:
         tokens = response.json()
-        print("✓ Login successful")
-        print(f"  Access token: {tokens['access'][:50]}...")
+        print("✓ Login successful", file=out)
+        print(f"  Access token: {tokens['access'][:50]}...", file=out)
         return tokens["access"]
     else:
-        print(f"✗ Login failed: {response.status_code}")
-        print(response.json())
+        print(f"✗ Login failed: {response.status_code}", file=out)
+        print(response.json(), file=out)
         return None
 
 
-def test_wallets(token):
+def test_wallets(token, out=sys.stdout):
     """Test wallet endpoints"""
-    print("\n=== Testing Wallets ===")
+    print("\n=== Testing Wallets ===", file=out)
     headers = {"Authorization": f"Bearer {token}"}
 
     # List wallets
-    response = requests.get(f"{BASE_URL}/v1/wallets/", headers=headers)
+    response = get_session().get(f"{BASE_URL}/v1/wallets/", headers=headers)
     if response.status_code == 200:
         wallets = response.json()
-        print(f"✓ List wallets: Found {len(wallets)} wallets")
+        print(f"✓ List wallets: Found {len(wallets)} wallets", file=out)
         for wallet in wallets[:3]:  # Show first 3
-            print(f"  - {wallet['label']} ({wallet['chain']})")
+            print(f"  - {wallet['label']} ({wallet['chain']})", file=out)
         return wallets[0]["id"] if wallets else None
     else:
-        print(f"✗ List wallets failed: {response.status_code}")
+        print(f"✗ List wallets failed: {response.status_code}", file=out)
         return None
 
 
-def test_portfolio(token):
+def test_portfolio(token, out=sys.stdout):
     """Test portfolio endpoints"""
-    print("\n=== Testing Portfolio ===")
+    print("\n=== Testing Portfolio ===", file=out)
     headers = {"Authorization": f"Bearer {token}"}
 
     # Portfolio summary
-    response = requests.get(f"{BASE_URL}/v1/portfolio/summary", headers=headers)
+    response = get_session().get(f"{BASE_URL}/v1/portfolio/summary", headers=headers)
     if response.status_code == 200:
         summary = response.json()
-        print("✓ Portfolio summary:")
-        print(f"  Total value: ${summary['total_value_usd']:,.2f}")
-        print(f"  24h change: {summary['change_24h']:.2f}%")
-        print(f"  Wallets: {summary['wallet_count']}")
+        print("✓ Portfolio summary:", file=out)
+        print(f"  Total value: ${summary['total_value_usd']:,.2f}", file=out)
+        print(f"  24h change: {summary['change_24h']:.2f}%", file=out)
+        print(f"  Wallets: {summary['wallet_count']}", file=out)
     else:
-        print(f"✗ Portfolio summary failed: {response.status_code}")
+        print(f"✗ Portfolio summary failed: {response.status_code}", file=out)
 
     # Historical data
-    response = requests.get(
+    response = get_session().get(
         f"{BASE_URL}/v1/portfolio/history?period=24h", headers=headers
     )
     if response.status_code == 200:
         history = response.json()
-        print(f"✓ Portfolio history: {len(history)} data points")
+        print(f"✓ Portfolio history: {len(history)} data points", file=out)
     else:
-        print(f"✗ Portfolio history failed: {response.status_code}")
+        print(f"✗ Portfolio history failed: {response.status_code}", file=out)
 
 
-def test_transactions(token):
+def test_transactions(token, out=sys.stdout):
     """Test transaction endpoints"""
-    print("\n=== Testing Transactions ===")
+    print("\n=== Testing Transactions ===", file=out)
     headers = {"Authorization": f"Bearer {token}"}
 
     # List transactions
-    response = requests.get(
+    response = get_session().get(
         f"{BASE_URL}/v1/transactions/?page=1&page_size=10", headers=headers
     )
     if response.status_code == 200:
         data = response.json()
         transactions = data["results"]
         print(
-            f"✓ List transactions: Found {data['count']} total, showing {len(transactions)}"
+            f"✓ List transactions: Found {data['count']} total, showing {len(transactions)}",
+            file=out,
         )
         for tx in transactions[:3]:  # Show first 3
-            print(f"  - {tx['transaction_type']} {tx['amount']} {tx['asset_symbol']}")
+            print(f"  - {tx['transaction_type']} {tx['amount']} {tx['asset_symbol']}", file=out)
     else:
-        print(f"✗ List transactions failed: {response.status_code}")
+        print(f"✗ List transactions failed: {response.status_code}", file=out)
 
     # Transaction stats
-    response = requests.get(f"{BASE_URL}/v1/transactions/stats", headers=headers)
+    response = get_session().get(f"{BASE_URL}/v1/transactions/stats", headers=headers)
     if response.status_code == 200:
         stats = response.json()
-        print("✓ Transaction stats:")
-        print(f"  Total transactions: {stats['total_transactions']}")
-        print(f"  Total volume: ${stats['total_volume_usd']:,.2f}")
-        print(f"  24h transactions: {stats['transactions_24h']}")
+        print("✓ Transaction stats:", file=out)
+        print(f"  Total transactions: {stats['total_transactions']}", file=out)
+        print(f"  Total volume: ${stats['total_volume_usd']:,.2f}", file=out)
+        print(f"  24h transactions: {stats['transactions_24h']}", file=out)
     else:
-        print(f"✗ Transaction stats failed: {response.status_code}")
+        print(f"✗ Transaction stats failed: {response.status_code}", file=out)
 
 
-def test_sse(token):
+def test_sse(token, out=sys.stdout):
     """Test SSE endpoint (just check if it connects)"""
-    print("\n=== Testing SSE Endpoint ===")
+    print("\n=== Testing SSE Endpoint ===", file=out)
     headers = {"Authorization": f"Bearer {token}"}
 
     # Just test that we can connect to the SSE endpoint
     try:
-        response = requests.get(
+        # Close the stream on exit so its connection is not left half-read
+        with get_session().get(
             f"{BASE_URL}/v1/portfolio/stream", headers=headers, stream=True, timeout=1
-        )
-        if response.status_code == 200:
-            print("✓ SSE endpoint accessible")
-            # Read just the first event
-            for line in response.iter_lines():
-                if line:
-                    print(f"  Received event: {line.decode()[:100]}...")
-                    break
-        else:
-            print(f"✗ SSE endpoint failed: {response.status_code}")
+        ) as response:
+            if response.status_code == 200:
+                print("✓ SSE endpoint accessible", file=out)
+                # Read just the first event
+                for line in response.iter_lines():
+                    if line:
+                        print(f"  Received event: {line.decode()[:100]}...", file=out)
+                        break
+            else:
+                print(f"✗ SSE endpoint failed: {response.status_code}", file=out)
     except requests.exceptions.Timeout:
-        print("✓ SSE endpoint connected (timeout expected)")
+        print("✓ SSE endpoint connected (timeout expected)", file=out)
     except Exception as e:
-        print(f"✗ SSE error: {e}")
+        print(f"✗ SSE error: {e}", file=out)
 
 
 def main():
     """Run all tests"""
-    print("=== Portfolio Dashboard API Tests ===")
-    print(f"Testing against: {BASE_URL}")
-
-    # Test authentication
-    token = test_auth()
-    if not token:
-        print("\nAuthentication failed. Cannot continue tests.")
-        return
-
-    # Test other endpoints
-    test_wallets(token)
-    test_portfolio(token)
-    test_transactions(token)
-    test_sse(token)
-
-    print("\n=== Tests Complete ===")
+    # Collect all output and write it to stdout in one go
+    out = io.StringIO()
+    print("=== Portfolio Dashboard API Tests ===", file=out)
+    print(f"Testing against: {BASE_URL}", file=out)
+
+    # Whatever was collected is written out even if a check raises
+    try:
+        # Test authentication
+        token = test_auth(out)
+        if not token:
+            print("\nAuthentication failed. Cannot continue tests.", file=out)
+            return
+
+        # The endpoint checks are independent, so overlap their requests; each
+        # one writes to its own buffer and the buffers are joined in order
+        tests = [test_wallets, test_portfolio, test_transactions, test_sse]
+        buffers = [io.StringIO() for _ in tests]
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [
+                executor.submit(test, token, buffer) for test, buffer in zip(tests, buffers)
+            ]
+        # A check that raises (e.g. the server went away) is reported in its own
+        # section; the other checks' results are still printed
+        for future, buffer in zip(futures, buffers):
+            error = future.exception()
+            if error is not None:
+                print(f"✗ Check aborted: {error!r}", file=buffer)
+            out.write(buffer.getvalue())
+
+        print("\n=== Tests Complete ===", file=out)
+    finally:
+        sys.stdout.write(out.getvalue())
 
 
 if __name__ == "__main__":
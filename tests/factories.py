@@ -170,6 +170,35 @@ class TransferTransactionFactory(TransactionFactory):
 
 # Utility functions for creating test data scenarios
 
+def make_tx_hash(index):
+    """Deterministic, unique transaction hash for the given index."""
+    return f"0x{index:064x}"
+
+
+def make_address(index):
+    """Deterministic, unique EVM-style address for the given index."""
+    return f"0x{index:040x}"
+
+
+def build_transaction(wallet, asset_symbol, index, transaction_type=TransactionType.BUY,
+                      amount="1", timestamp=None):
+    """Build an unsaved transaction for bulk_create.
+    
+    Hashes and block numbers derive from index, so large batches need no
+    random data or hand-written literals.
+    """
+    return Transaction(
+        wallet=wallet,
+        tx_hash=make_tx_hash(index),
+        block_number=12345 + index,
+        transaction_type=transaction_type,
+        amount=Decimal(amount),
+        asset_symbol=asset_symbol,
+        gas_fee=Decimal("0.001"),
+        timestamp=timestamp or timezone.now(),
+    )
+
+
 def create_user_with_wallets(num_wallets=2):
     """Create a user with multiple wallets."""
     user = UserFactory()
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import List, Optional
 
+from django.db.models import Count, Sum
 from django.utils import timezone
 from ninja import Query, Router, Schema
 from ninja.pagination import PageNumberPagination, paginate
@@ -11,6 +12,8 @@ from .models import Transaction, TransactionType
 
 router = Router()
 
+_TRANSACTION_TYPES = frozenset(TransactionType.values)
+
 
 class TransactionSchema(Schema):
     id: int
@@ -64,7 +67,7 @@ def list_transactions(request, filters: TransactionFilterSchema = Query(...)):
     ).select_related("wallet")
 
     # Apply filters
-    if filters.type and filters.type in [t[0] for t in TransactionType.choices]:
+    if filters.type and filters.type in _TRANSACTION_TYPES:
         qs = qs.filter(transaction_type=filters.type)
 
     if filters.wallet_id:
@@ -113,8 +116,6 @@ class TransactionStatsSchema(Schema):
 @router.get("/stats", auth=AuthBearer(), response=TransactionStatsSchema)
 def transaction_stats(request):
     """Get transaction statistics for the user"""
-    from django.db.models import Count, Sum
-
     user_transactions = Transaction.objects.filter(
         wallet__user=request.user, wallet__is_active=True
     )
@@ -134,7 +135,8 @@ def transaction_stats(request):
         .order_by("-count")
     )
 
-    most_traded = asset_counts.first()["asset_symbol"] if asset_counts else None
+    top_asset = asset_counts.first()
+    most_traded = top_asset["asset_symbol"] if top_asset else None
 
     return {
         "total_transactions": total,
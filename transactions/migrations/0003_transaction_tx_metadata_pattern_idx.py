@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 12:00
+
+import django.db.models.fields.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                django.db.models.fields.json.KeyTextTransform("pattern", "metadata"),
+                name="tx_metadata_pattern_idx",
+            ),
+        ),
+    ]
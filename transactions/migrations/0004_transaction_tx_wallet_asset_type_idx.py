@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_transaction_tx_metadata_pattern_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["wallet", "asset_symbol", "transaction_type"],
+                name="tx_wallet_asset_type_idx",
+            ),
+        ),
+    ]
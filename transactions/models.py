@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.fields.json import KeyTextTransform
 
 from wallets.models import Chain, User, Wallet
 
@@ -36,6 +37,16 @@ class Transaction(models.Model):
             models.Index(fields=["wallet", "-timestamp"]),
             models.Index(fields=["transaction_type", "-timestamp"]),
             models.Index(fields=["asset_symbol", "-timestamp"]),
+            # Supports per-wallet, per-asset balance aggregation
+            models.Index(
+                fields=["wallet", "asset_symbol", "transaction_type"],
+                name="tx_wallet_asset_type_idx",
+            ),
+            # Supports grouping suspicious transactions by metadata pattern
+            models.Index(
+                KeyTextTransform("pattern", "metadata"),
+                name="tx_metadata_pattern_idx",
+            ),
         ]
 
     def __str__(self):
@@ -9,6 +9,8 @@ from .models import Chain, Wallet
 
 router = Router()
 
+_CHAIN_VALUES = tuple(Chain.values)
+
 
 class WalletCreateSchema(Schema):
     address: str
@@ -36,16 +38,19 @@ class ErrorSchema(Schema):
 @router.get("/", auth=AuthBearer(), response=List[WalletSchema])
 def list_wallets(request):
     """List all wallets for the authenticated user"""
-    return request.user.wallets.filter(is_active=True)
+    # Select only the columns WalletSchema serializes (skips the notes TEXT)
+    return request.user.wallets.filter(is_active=True).only(
+        "id", "address", "chain", "label", "is_active", "created_at"
+    )
 
 
 @router.post("/", auth=AuthBearer(), response={201: WalletSchema, 400: ErrorSchema})
 def create_wallet(request, data: WalletCreateSchema):
     """Add a new wallet address"""
     # Validate chain
-    if data.chain not in [choice[0] for choice in Chain.choices]:
+    if data.chain not in _CHAIN_VALUES:
         return 400, {
-            "error": f"Invalid chain. Must be one of: {', '.join([c[0] for c in Chain.choices])}"
+            "error": f"Invalid chain. Must be one of: {', '.join(_CHAIN_VALUES)}"
         }
 
     # Check if wallet already exists for this user